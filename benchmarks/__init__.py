@@ -0,0 +1 @@
+"""博联窗帘离线基准与调试工具."""
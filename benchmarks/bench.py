@@ -0,0 +1,244 @@
+"""博联窗帘离线性能基准.
+
+用模拟的博联设备驱动真实的 BroadlinkCurtainCoordinator 和 BroadlinkCurtainEntity，
+分别测量 1-200 个窗帘同时移动时的发送吞吐量、指令延迟、状态写入次数和位置误差。
+需要安装 homeassistant（与组件运行环境一致），不需要真实设备。
+
+运行（在仓库根目录）:
+    python -m benchmarks.bench --curtains 1,10,50,200 --latency 40 --jitter 10 --loss 0.02
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.broadlink_curtain.const import (
+    CONF_CURTAINS,
+    CONF_CURTAIN_CLOSE_CODE,
+    CONF_CURTAIN_MOVE_TIME,
+    CONF_CURTAIN_NAME,
+    CONF_CURTAIN_OPEN_CODE,
+    CONF_CURTAIN_STOP_CODE,
+    CONF_HOST,
+    CONF_MAC,
+    CONF_TIMEOUT,
+    RF_CODE_CLOSE,
+    RF_CODE_OPEN,
+    RF_CODE_STOP,
+)
+from custom_components.broadlink_curtain.coordinator import BroadlinkCurtainCoordinator
+from custom_components.broadlink_curtain.cover import BroadlinkCurtainEntity
+from custom_components.broadlink_curtain.group import async_move_group
+
+from .fake_hub import FakeBroadlinkHub, async_start_fake_hub
+
+# 射频码第一个字节区分指令，后两个字节为窗帘序号
+_COMMAND_BYTES = {RF_CODE_OPEN: 0xA1, RF_CODE_CLOSE: 0xA2, RF_CODE_STOP: 0xA3}
+_COMMANDS_BY_BYTE = {value: key for key, value in _COMMAND_BYTES.items()}
+
+
+def _rf_code(command: str, index: int) -> str:
+    return bytes([_COMMAND_BYTES[command], index >> 8, index & 0xFF, 0x5A]).hex()
+
+
+async def _async_create_hass(config_dir: str) -> HomeAssistant:
+    """创建最小的 HomeAssistant 实例（兼容新旧构造函数）."""
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+    return hass
+
+
+def _true_positions(
+    fake: FakeBroadlinkHub, count: int, move_time: float, until: float
+) -> List[float]:
+    """按模拟设备发出射频码的时间重建每个窗帘电机的真实位置（线性行程）."""
+    positions = [0.0] * count
+    moving: List[Tuple[float, int]] = [(0.0, 0)] * count  # (开始时间, 方向)
+    speed = 100.0 / move_time
+
+    def _advance(index: int, now: float) -> None:
+        started, direction = moving[index]
+        if direction:
+            positions[index] = min(
+                100.0, max(0.0, positions[index] + direction * speed * (now - started))
+            )
+        moving[index] = (now, direction)
+
+    for emitted_at, code in fake.emitted:
+        command = _COMMANDS_BY_BYTE.get(code[0])
+        index = (code[1] << 8) | code[2]
+        if command is None or index >= count:
+            continue
+        _advance(index, emitted_at)
+        direction = {RF_CODE_OPEN: 1, RF_CODE_CLOSE: -1}.get(command, 0)
+        moving[index] = (emitted_at, direction)
+
+    for index in range(count):
+        _advance(index, until)
+    return positions
+
+
+async def _async_run_scene(
+    hass: HomeAssistant,
+    fake: FakeBroadlinkHub,
+    count: int,
+    args: argparse.Namespace,
+    scene: int,
+) -> Dict[str, Any]:
+    """执行一个场景: count 个窗帘从 0% 同时移动到目标位置."""
+    entry = SimpleNamespace(
+        entry_id=f"bench_{scene}",
+        title=f"bench {count}",
+        options={},
+        data={
+            CONF_HOST: "127.0.0.1",
+            CONF_MAC: f"02:00:00:00:{scene >> 8:02x}:{scene & 0xFF:02x}",
+            CONF_TIMEOUT: 5,
+            CONF_CURTAINS: [
+                {
+                    CONF_CURTAIN_NAME: f"curtain_{index}",
+                    CONF_CURTAIN_OPEN_CODE: _rf_code(RF_CODE_OPEN, index),
+                    CONF_CURTAIN_CLOSE_CODE: _rf_code(RF_CODE_CLOSE, index),
+                    CONF_CURTAIN_STOP_CODE: _rf_code(RF_CODE_STOP, index),
+                    CONF_CURTAIN_MOVE_TIME: args.move_time,
+                }
+                for index in range(count)
+            ],
+        },
+    )
+
+    coordinator = BroadlinkCurtainCoordinator(hass, entry)
+    coordinator.hub.session.port = fake.port
+
+    writes = 0
+
+    def _count_write() -> None:
+        nonlocal writes
+        writes += 1
+
+    entities = []
+    for index, curtain in enumerate(coordinator.curtains):
+        entity = BroadlinkCurtainEntity(coordinator, curtain)
+        entity.hass = hass
+        entity.entity_id = f"cover.bench_{scene}_{index}"
+        # 只统计状态写入次数，不经过状态机
+        entity.async_write_ha_state = _count_write
+        coordinator.register_entity(entity)
+        entities.append(entity)
+
+    fake.emitted.clear()
+    loop = asyncio.get_running_loop()
+    try:
+        if not await coordinator.async_test_connection():
+            raise RuntimeError("无法连接模拟设备")
+
+        started = loop.time()
+        if args.group:
+            await async_move_group(hass, [(entity, args.target) for entity in entities])
+        else:
+            for entity in entities:
+                await entity.async_set_cover_position(position=args.target)
+
+        # 等待所有移动结束（移动任务启动前也视为未结束）
+        deadline = started + args.move_time * 3 + 10
+        while loop.time() < deadline and any(
+            entity.motion is not None
+            or entity.is_opening
+            or entity.is_closing
+            or entity.current_cover_position != args.target
+            for entity in entities
+        ):
+            await asyncio.sleep(0.02)
+        elapsed = loop.time() - started
+
+        true_positions = _true_positions(fake, count, args.move_time, loop.time())
+        errors = [
+            abs(true - entity.current_cover_position)
+            for true, entity in zip(true_positions, entities)
+        ]
+        stats = coordinator.hub.stats
+        return {
+            "curtains": count,
+            "elapsed_s": round(elapsed, 2),
+            "commands": stats["send_acked"],
+            "throughput_cmd_s": round(stats["send_acked"] / elapsed, 1) if elapsed else None,
+            "latency_p50_ms": stats["send_latency_p50_ms"],
+            "latency_p95_ms": stats["send_latency_p95_ms"],
+            "latency_p99_ms": stats["send_latency_p99_ms"],
+            "queue_wait_max_ms": stats["queue_wait_max_ms"],
+            "retries": stats["send_retries"],
+            "failed": stats["send_failed"],
+            "state_writes": writes,
+            "writes_per_curtain": round(writes / count, 1),
+            "position_error_avg": round(sum(errors) / count, 2),
+            "position_error_max": round(max(errors), 2),
+            "stop_drift_p95_ms": stats["stop_drift_p95_ms"],
+        }
+    finally:
+        for entity in entities:
+            entity.abort_move()
+        await coordinator.async_close()
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    columns = list(results[0])
+    widths = [max(len(column), *(len(str(row[column])) for row in results)) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in results:
+        print("  ".join(str(row[column]).rjust(width) for column, width in zip(columns, widths)))
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_create_hass(config_dir)
+        fake = await async_start_fake_hub(
+            latency=args.latency / 1000,
+            jitter=args.jitter / 1000,
+            loss=args.loss,
+            seed=args.seed,
+        )
+        results = []
+        try:
+            for scene, count in enumerate(args.curtains):
+                cpu = time.process_time()
+                result = await _async_run_scene(hass, fake, count, args, scene)
+                result["cpu_s"] = round(time.process_time() - cpu, 2)
+                results.append(result)
+        finally:
+            fake.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="博联窗帘离线性能基准")
+    parser.add_argument(
+        "--curtains",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 10, 50, 200],
+        help="逗号分隔的场景窗帘数量",
+    )
+    parser.add_argument("--move-time", type=float, default=20, help="窗帘全程时间（秒）")
+    parser.add_argument("--target", type=int, default=50, help="目标位置 0-100")
+    parser.add_argument("--group", action="store_true", help="使用 move_group 批量移动")
+    parser.add_argument("--latency", type=float, default=40, help="模拟往返延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=10, help="模拟延迟抖动（毫秒）")
+    parser.add_argument("--loss", type=float, default=0, help="模拟丢包率 0-1")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    asyncio.run(_async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""模拟博联 RM4 设备（离线测试和性能基准用）.
+
+实现认证 (0x65) 和指令 (0x6A) 两种数据包，收到 send_data 时记录射频码的发出时间。
+可以配置网络延迟、抖动和丢包率，用于在没有真实硬件时测量发送和运动路径的性能。
+
+单独运行:
+    python -m benchmarks.fake_hub --port 8080 --latency 40 --jitter 10 --loss 0.02
+"""
+import argparse
+import asyncio
+import os
+import random
+import struct
+from typing import List, Optional, Tuple
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+# 与设备固件一致的协议常量
+_INIT_KEY = bytes.fromhex("097628343fe99e23765c1513accf8b02")
+_INIT_VECT = bytes.fromhex("562e17996d093d28ddb3ba695a2e6f58")
+
+PACKET_AUTH = 0x65
+PACKET_COMMAND = 0x6A
+PACKET_AUTH_RESPONSE = 0x3E9
+PACKET_COMMAND_RESPONSE = 0x3EE
+
+CMD_SEND_DATA = 0x02
+CMD_CHECK_SENSORS = 0x24
+
+
+def _checksum(data: bytes) -> int:
+    return sum(data, 0xBEAF) & 0xFFFF
+
+
+def _crypt(key: bytes, payload: bytes, encrypt: bool) -> bytes:
+    cipher = Cipher(algorithms.AES(key), modes.CBC(_INIT_VECT))
+    context = cipher.encryptor() if encrypt else cipher.decryptor()
+    return context.update(payload) + context.finalize()
+
+
+class FakeBroadlinkHub(asyncio.DatagramProtocol):
+    """模拟的 RM4 设备.
+
+    每个请求先按丢包率丢弃，然后等待单程延迟（加随机抖动）后“发出”射频信号
+    并记录时间，再等待单程延迟后返回响应。emitted 中保存
+    (loop 时间, 射频码) 列表，供基准脚本按时间重建电机的真实位置。
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.04,
+        jitter: float = 0.0,
+        loss: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """初始化模拟设备（时间单位为秒）."""
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.emitted: List[Tuple[float, bytes]] = []
+        self.received = 0
+        self.dropped = 0
+        self._random = random.Random(seed)
+        self._key = os.urandom(16)
+        self._id = 1
+        self._tasks: set = set()
+
+    @property
+    def port(self) -> int:
+        """返回监听端口."""
+        return self.transport.get_extra_info("sockname")[1]
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.received += 1
+        if self._random.random() < self.loss:
+            self.dropped += 1
+            return
+        task = asyncio.get_running_loop().create_task(self._async_handle(data, addr))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _one_way_delay(self) -> float:
+        return max(0.0, self.latency / 2 + self._random.uniform(-self.jitter, self.jitter) / 2)
+
+    async def _async_handle(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """处理一个请求."""
+        if len(data) < 0x38:
+            return
+        packet_type = int.from_bytes(data[0x26:0x28], "little")
+        count = data[0x28:0x2A]
+        loop = asyncio.get_running_loop()
+
+        await asyncio.sleep(self._one_way_delay())
+
+        if packet_type == PACKET_AUTH:
+            payload = _crypt(_INIT_KEY, data[0x38:], False)
+            response_payload = bytearray(0x20)
+            response_payload[0x00:0x04] = self._id.to_bytes(4, "little")
+            response_payload[0x04:0x14] = self._key
+            response = self._build_response(
+                PACKET_AUTH_RESPONSE, count, _INIT_KEY, bytes(response_payload)
+            )
+        elif packet_type == PACKET_COMMAND:
+            payload = _crypt(self._key, data[0x38:], False)
+            p_len, command = struct.unpack("<HI", payload[:0x06])
+            if command == CMD_SEND_DATA:
+                self.emitted.append((loop.time(), bytes(payload[0x06 : p_len + 2])))
+            response_payload = struct.pack("<HI", 4, command)
+            response = self._build_response(
+                PACKET_COMMAND_RESPONSE, count, self._key, response_payload
+            )
+        else:
+            return
+
+        await asyncio.sleep(self._one_way_delay())
+        if self.transport is not None:
+            self.transport.sendto(response, addr)
+
+    def _build_response(
+        self, packet_type: int, count: bytes, key: bytes, payload: bytes
+    ) -> bytes:
+        """构造响应数据包."""
+        padding = (16 - len(payload)) % 16
+        packet = bytearray(0x38)
+        packet[0x00:0x08] = bytes.fromhex("5aa5aa555aa5aa55")
+        packet[0x26:0x28] = packet_type.to_bytes(2, "little")
+        packet[0x28:0x2A] = count
+        packet[0x30:0x34] = self._id.to_bytes(4, "little")
+        packet[0x34:0x36] = _checksum(payload).to_bytes(2, "little")
+        packet.extend(_crypt(key, payload + bytes(padding), True))
+        packet[0x20:0x22] = _checksum(packet).to_bytes(2, "little")
+        return bytes(packet)
+
+    def close(self) -> None:
+        """停止模拟设备."""
+        for task in self._tasks:
+            task.cancel()
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+
+async def async_start_fake_hub(
+    host: str = "127.0.0.1", port: int = 0, **options
+) -> FakeBroadlinkHub:
+    """在本机启动模拟设备，port 为 0 时随机分配端口."""
+    loop = asyncio.get_running_loop()
+    _, hub = await loop.create_datagram_endpoint(
+        lambda: FakeBroadlinkHub(**options), local_addr=(host, port)
+    )
+    return hub
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    hub = await async_start_fake_hub(
+        args.host,
+        args.port,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        loss=args.loss,
+    )
+    print(f"模拟博联设备已启动: {args.host}:{hub.port}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"收到 {hub.received} 个数据包，丢弃 {hub.dropped} 个，发出射频码 {len(hub.emitted)} 次")
+    finally:
+        hub.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="模拟博联 RM4 设备")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=40, help="往返延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="延迟抖动（毫秒）")
+    parser.add_argument("--loss", type=float, default=0, help="丢包率 0-1")
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,332 @@
+"""位置估算精度回放工具.
+
+把记录下来的指令时间线回放到组件的运动模型 (motion.py)，
+与位置观测值比较，统计长时间部分移动后的累计误差和漂移，
+并可以扫描行程参数，找出与历史记录最吻合的标定值。
+
+输入（--events，可重复）:
+- 诊断信息 JSON（下载诊断得到的文件，使用其中的 send_trace 和各窗帘行程参数）
+- 事件 JSON 列表: [{"time": 1700000000.0, "curtain": "客厅", "event": "open"}, ...]
+- CSV: time,curtain,event,value（event 为 open/close/stop/position，position 的 value 为观测位置；
+  time 可以是 Unix 时间戳或 ISO 时间）
+
+观测位置通常来自 set_position_manually 的手动校正，也可以用 --truth 指定一个“真实”电机参数，
+由回放工具模拟真实位置，在每次停止后观测，用于评估参数偏差带来的漂移。
+
+示例:
+    python -m benchmarks.replay --events diagnostics.json --truth 31,27,0.4
+    python -m benchmarks.replay --events moves.csv --sweep open_time=25:35:0.5 --sweep close_time=25:35:0.5
+"""
+import argparse
+import csv
+from datetime import datetime
+import importlib.util
+import itertools
+import json
+from pathlib import Path
+import sys
+import time
+import types
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "broadlink_curtain"
+
+# (时间, 窗帘, 事件, 观测位置)
+Event = Tuple[float, str, str, Optional[float]]
+
+_MOVE_TARGETS = {"open": 100.0, "close": 0.0}
+
+
+def _load_motion_module() -> types.ModuleType:
+    """按文件路径加载 const.py 和 motion.py，不导入 homeassistant."""
+    package_name = "_broadlink_curtain_motion"
+    if f"{package_name}.motion" in sys.modules:
+        return sys.modules[f"{package_name}.motion"]
+
+    package = types.ModuleType(package_name)
+    package.__path__ = [str(_COMPONENT_DIR)]  # type: ignore[attr-defined]
+    sys.modules[package_name] = package
+    for name in ("const", "motion"):
+        spec = importlib.util.spec_from_file_location(
+            f"{package_name}.{name}", _COMPONENT_DIR / f"{name}.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[f"{package_name}.motion"]
+
+
+motion = _load_motion_module()
+TravelProfile = motion.TravelProfile
+
+
+def _parse_time(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+def _load_events(path: Path) -> Tuple[List[Event], Dict[str, Dict[str, Any]]]:
+    """读取事件文件，返回 (事件列表, 诊断信息中的窗帘行程参数)."""
+    events: List[Event] = []
+    profiles: Dict[str, Dict[str, Any]] = {}
+
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                value = row.get("value")
+                events.append(
+                    (
+                        _parse_time(row["time"]),
+                        row["curtain"],
+                        row["event"].strip().lower(),
+                        float(value) if value not in (None, "") else None,
+                    )
+                )
+        return events, profiles
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = data.get("data", data)
+        for name, curtain in data.get("curtains", {}).items():
+            profiles[name] = curtain.get("travel_profile", {})
+        records = data.get("send_trace", [])
+    else:
+        records = data
+
+    for record in records:
+        if record.get("result") is False:
+            continue
+        kind = record.get("event") or record.get("command")
+        if kind is None:
+            continue
+        value = record.get("value", record.get("position"))
+        events.append(
+            (
+                _parse_time(record["time"]),
+                str(record["curtain"]),
+                str(kind).lower(),
+                float(value) if value is not None else None,
+            )
+        )
+    return events, profiles
+
+
+def _match_profile(curtain: str, profiles: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """发送记录中的窗帘键是 unique_id（条目ID_名称），按名称后缀匹配行程参数."""
+    if curtain in profiles:
+        return profiles[curtain]
+    for name, profile in profiles.items():
+        if curtain.endswith(f"_{name}"):
+            return profile
+    return None
+
+
+def replay(
+    events: Sequence[Event],
+    profile: Any,
+    truth: Optional[Any] = None,
+    resync: bool = True,
+) -> Dict[str, Any]:
+    """回放单个窗帘的事件并返回误差统计.
+
+    指定 truth 时，由 truth 参数模拟真实位置并在每次停止后观测；
+    否则使用事件中的 position 观测值。resync 为 True 时观测后把估算位置校正为观测值，
+    与手动校正后的组件行为一致。
+    """
+    estimate = _Tracker(profile)
+    actual = _Tracker(truth) if truth is not None else None
+    errors: List[Tuple[int, float]] = []
+    moves = 0
+
+    for event_time, _, kind, value in events:
+        if kind in _MOVE_TARGETS:
+            moves += 1
+            estimate.start(event_time, _MOVE_TARGETS[kind])
+            if actual is not None:
+                actual.start(event_time, _MOVE_TARGETS[kind])
+        elif kind == "stop":
+            estimate.stop(event_time)
+            if actual is not None:
+                actual.stop(event_time)
+                errors.append((moves, estimate.position - actual.position))
+        elif kind == "position" and value is not None and actual is None:
+            errors.append((moves, estimate.at(event_time) - value))
+            if resync:
+                estimate.reset(event_time, value)
+
+    abs_errors = [abs(error) for _, error in errors]
+    return {
+        "moves": moves,
+        "observations": len(errors),
+        "mae": round(sum(abs_errors) / len(abs_errors), 2) if errors else None,
+        "max_abs": round(max(abs_errors), 2) if errors else None,
+        "final_drift": round(errors[-1][1], 2) if errors else None,
+        "drift_per_100_moves": _slope(errors),
+    }
+
+
+class _Tracker:
+    """按组件的方式跟踪一个窗帘的位置（移动中按运动模型插值）."""
+
+    __slots__ = ("profile", "position", "motion")
+
+    def __init__(self, profile: Any):
+        self.profile = profile
+        self.position = 0.0
+        self.motion = None
+
+    def at(self, now: float) -> float:
+        return self.motion.position_at(now) if self.motion is not None else self.position
+
+    def start(self, now: float, target: float) -> None:
+        self.position = self.at(now)
+        self.motion = self.profile.plan(self.position, target, now)
+
+    def stop(self, now: float) -> None:
+        self.position = self.at(now)
+        self.motion = None
+
+    def reset(self, now: float, position: float) -> None:
+        self.position = position
+        self.motion = None
+
+
+def _slope(points: Sequence[Tuple[int, float]]) -> Optional[float]:
+    """误差随移动次数变化的最小二乘斜率（每100次移动）."""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var:
+        return None
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return round(cov / var * 100, 2)
+
+
+def _parse_range(spec: str) -> Tuple[str, List[float]]:
+    """解析 name=start:stop:step."""
+    name, _, values = spec.partition("=")
+    start, stop, step = (float(item) for item in values.split(":"))
+    count = int(round((stop - start) / step)) + 1
+    return name, [round(start + step * index, 6) for index in range(count)]
+
+
+def _profile_from_args(args: argparse.Namespace, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    params = {
+        "open_time": args.open_time,
+        "close_time": args.close_time,
+        "startup_lag": args.startup_lag,
+        "position_curve": None,
+    }
+    if config:
+        for key in params:
+            if config.get(key) is not None and getattr(args, key, None) is None:
+                params[key] = config[key]
+    params["open_time"] = params["open_time"] or 30.0
+    params["close_time"] = params["close_time"] or params["open_time"]
+    params["startup_lag"] = params["startup_lag"] or 0.0
+    return params
+
+
+def _build_profile(params: Dict[str, Any]) -> Any:
+    return TravelProfile(
+        params["open_time"],
+        params["close_time"],
+        params["startup_lag"],
+        params.get("position_curve") or None,
+    )
+
+
+def _group_by_curtain(events: Iterable[Event]) -> Dict[str, List[Event]]:
+    curtains: Dict[str, List[Event]] = {}
+    for event in sorted(events, key=lambda item: item[0]):
+        curtains.setdefault(event[1], []).append(event)
+    return curtains
+
+
+def _print_rows(rows: List[Dict[str, Any]]) -> None:
+    columns = list(rows[0])
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[column]).rjust(width) for column, width in zip(columns, widths)))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="博联窗帘位置估算精度回放")
+    parser.add_argument("--events", type=Path, action="append", required=True, help="事件文件")
+    parser.add_argument("--curtain", help="只回放指定窗帘")
+    parser.add_argument("--open-time", type=float, help="估算用的打开时间（秒）")
+    parser.add_argument("--close-time", type=float, help="估算用的关闭时间（秒）")
+    parser.add_argument("--startup-lag", type=float, help="估算用的启动延迟（秒）")
+    parser.add_argument(
+        "--truth",
+        type=lambda value: [float(item) for item in value.split(",")],
+        help="模拟真实电机: 打开时间,关闭时间[,启动延迟]",
+    )
+    parser.add_argument("--no-resync", action="store_true", help="观测后不校正估算位置")
+    parser.add_argument(
+        "--sweep",
+        type=_parse_range,
+        action="append",
+        default=[],
+        help="扫描参数 name=start:stop:step（open_time/close_time/startup_lag）",
+    )
+    parser.add_argument("--top", type=int, default=5, help="扫描时显示的最佳结果数")
+    args = parser.parse_args(argv)
+
+    events: List[Event] = []
+    configs: Dict[str, Dict[str, Any]] = {}
+    for path in args.events:
+        loaded, profiles = _load_events(path)
+        events.extend(loaded)
+        configs.update(profiles)
+
+    curtains = _group_by_curtain(events)
+    if args.curtain:
+        curtains = {key: value for key, value in curtains.items() if key == args.curtain}
+    if not curtains:
+        parser.error("没有可回放的事件")
+
+    truth = None
+    if args.truth:
+        truth = TravelProfile(*args.truth)
+
+    started = time.perf_counter()
+    if not args.sweep:
+        rows = []
+        for curtain, curtain_events in curtains.items():
+            params = _profile_from_args(args, _match_profile(curtain, configs))
+            result = replay(curtain_events, _build_profile(params), truth, not args.no_resync)
+            rows.append({"curtain": curtain, **result})
+        _print_rows(rows)
+    else:
+        names = [name for name, _ in args.sweep]
+        grids = [values for _, values in args.sweep]
+        for curtain, curtain_events in curtains.items():
+            base = _profile_from_args(args, _match_profile(curtain, configs))
+            rows = []
+            for combination in itertools.product(*grids):
+                params = {**base, **dict(zip(names, combination))}
+                result = replay(curtain_events, _build_profile(params), truth, not args.no_resync)
+                if result["mae"] is None:
+                    continue
+                rows.append({**dict(zip(names, combination)), **result})
+            if not rows:
+                print(f"{curtain}: 没有观测值，无法评估")
+                continue
+            rows.sort(key=lambda row: row["mae"])
+            print(f"== {curtain}（{len(curtain_events)} 个事件）")
+            _print_rows(rows[: args.top])
+
+    print(f"\n回放耗时 {time.perf_counter() - started:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
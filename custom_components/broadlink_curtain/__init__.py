@@ -6,47 +6,77 @@ from typing import Any, Dict
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import CONF_CURTAIN_NAME, CONF_CURTAINS, DOMAIN
 from .coordinator import BroadlinkCurtainCoordinator
 from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.COVER]
+PLATFORMS: list[Platform] = [Platform.COVER, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """设置博联窗帘组件，服务只注册一次."""
+    await async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """设置博联窗帘配置条目."""
-    _LOGGER.info("正在设置博联窗帘组件")
+    _LOGGER.debug("正在设置博联窗帘组件: %s", entry.title)
     
     # 创建协调器
     coordinator = BroadlinkCurtainCoordinator(hass, entry)
     
-    # 测试连接
-    if not await coordinator.async_test_connection():
-        _LOGGER.error("无法连接到博联设备")
-        return False
-    
     # 存储协调器
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     
-    # 启动平台
+    # 启动平台，实体先从上次保存的状态恢复
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    
-    # 设置服务
-    await async_setup_services(hass)
-    
+
+    # 在后台连接设备，多个设备并行连接，不阻塞 Home Assistant 启动
+    coordinator.async_start()
+
+    # 选项中添加/删除窗帘后重新加载
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
+
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """卸载博联窗帘配置条目."""
-    _LOGGER.info("正在卸载博联窗帘组件")
+    _LOGGER.debug("正在卸载博联窗帘组件: %s", entry.title)
     
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close()
     
     return unload_ok
+
+
+async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """配置条目更新时调用，窗帘列表变化时重新加载."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    names = {curtain.get(CONF_CURTAIN_NAME) for curtain in entry.data.get(CONF_CURTAINS, [])}
+    if names == set(coordinator.curtain_names):
+        return
+
+    # 删除已移除窗帘的实体注册信息，设备诊断传感器等其他实体保持不变
+    removed = {
+        coordinator.curtain_unique_id(name)
+        for name in set(coordinator.curtain_names) - names
+    }
+    registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity_entry.domain == Platform.COVER and entity_entry.unique_id in removed:
+            registry.async_remove(entity_entry.entity_id)
+
+    _LOGGER.info("窗帘列表已变化，重新加载博联窗帘: %s", entry.title)
+    await hass.config_entries.async_reload(entry.entry_id)
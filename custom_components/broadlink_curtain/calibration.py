@@ -0,0 +1,182 @@
+"""博联窗帘行程自动标定."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from homeassistant.const import STATE_ON
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_CURTAIN_CALIBRATION,
+    CONF_CURTAIN_CLOSE_TIME,
+    CONF_CURTAIN_OPEN_TIME,
+    CURTAIN_STATE_CLOSING,
+    CURTAIN_STATE_OPENING,
+    CURTAIN_STATE_STOPPED,
+    DEFAULT_CALIBRATION_TIMEOUT,
+    RF_CODE_CLOSE,
+    RF_CODE_OPEN,
+    RF_CODE_STOP,
+)
+from .motion import TravelProfile
+
+if TYPE_CHECKING:
+    from .cover import BroadlinkCurtainEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CalibrationError(Exception):
+    """标定失败."""
+
+
+class CurtainCalibration:
+    """一次完整的开/关行程标定.
+
+    先把窗帘关到底作为起点，再分别测量完全打开和完全关闭所用的时间，
+    每段行程之间发送停止指令并等待电机停稳（reverse_delay）。
+    每段行程的终点由用户调用 calibration_mark 服务标记，
+    或由配置的终点信号实体变为 on 时自动标记。
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity: "BroadlinkCurtainEntity",
+        end_stop_entity_id: Optional[str] = None,
+        timeout: float = DEFAULT_CALIBRATION_TIMEOUT,
+    ):
+        """初始化标定."""
+        self.hass = hass
+        self.entity = entity
+        self.end_stop_entity_id = end_stop_entity_id
+        self.timeout = timeout
+        self.phase: Optional[str] = None
+        self._end_event = asyncio.Event()
+        self._mark_time: Optional[float] = None
+
+    @callback
+    def mark(self) -> None:
+        """标记当前行程已到达终点."""
+        if self._end_event.is_set():
+            return
+        self._mark_time = self.hass.loop.time()
+        self._end_event.set()
+
+    @callback
+    def _handle_end_stop(self, event: Event) -> None:
+        """终点信号实体状态变化."""
+        new_state = event.data.get("new_state")
+        if new_state is not None and new_state.state == STATE_ON:
+            self.mark()
+
+    async def _async_travel(self, command: str, state: str) -> float:
+        """发送指令并等待到达终点，返回行程时间（秒）."""
+        coordinator = self.entity.coordinator
+        self._end_event.clear()
+        self._mark_time = None
+
+        self.entity.set_calibration_state(state)
+        if not await coordinator.async_send_curtain_command(self.entity.curtain_name, command):
+            raise CalibrationError(f"{command} 指令发送失败")
+        started = self.hass.loop.time() - coordinator.rf_emit_delay
+
+        try:
+            await asyncio.wait_for(self._end_event.wait(), self.timeout)
+        except asyncio.TimeoutError as ex:
+            raise CalibrationError(f"等待行程终点超时（{self.timeout} 秒）") from ex
+
+        return self._mark_time - started
+
+    async def _async_stop_and_settle(self) -> None:
+        """到达终点后发送停止指令，等待电机停稳后再反向."""
+        await self.entity.coordinator.async_send_curtain_command(
+            self.entity.curtain_name, RF_CODE_STOP
+        )
+        self.entity.set_calibration_state(CURTAIN_STATE_STOPPED)
+        if self.entity.reverse_delay > 0:
+            await asyncio.sleep(self.entity.reverse_delay)
+
+    async def async_run(self) -> Dict[str, Any]:
+        """执行标定并返回标定结果."""
+        unsub = None
+        if self.end_stop_entity_id:
+            unsub = async_track_state_change_event(
+                self.hass, [self.end_stop_entity_id], self._handle_end_stop
+            )
+
+        try:
+            self.phase = "prepare"
+            await self._async_travel(RF_CODE_CLOSE, CURTAIN_STATE_CLOSING)
+            await self._async_stop_and_settle()
+
+            self.phase = "open"
+            open_measured = await self._async_travel(RF_CODE_OPEN, CURTAIN_STATE_OPENING)
+            await self._async_stop_and_settle()
+
+            self.phase = "close"
+            close_measured = await self._async_travel(RF_CODE_CLOSE, CURTAIN_STATE_CLOSING)
+        finally:
+            self.phase = None
+            if unsub is not None:
+                unsub()
+            await self.entity.coordinator.async_send_curtain_command(
+                self.entity.curtain_name, RF_CODE_STOP
+            )
+            self.entity.set_calibration_state(CURTAIN_STATE_STOPPED)
+
+        # 启动延迟包含在测得的时间内，拟合时从全程时间中扣除
+        current = self.entity.travel_profile
+        profile = TravelProfile(
+            max(1.0, open_measured - current.startup_lag),
+            max(1.0, close_measured - current.startup_lag),
+            current.startup_lag,
+            current.curve[1:-1],
+        )
+
+        rf_latency = self.entity.coordinator.rf_latency
+        return {
+            **profile.as_dict(),
+            CONF_CURTAIN_CALIBRATION: {
+                "open_measured": round(open_measured, 2),
+                "close_measured": round(close_measured, 2),
+                "rf_latency_ms": round(rf_latency * 1000, 1) if rf_latency is not None else None,
+                "calibrated_at": datetime.now().isoformat(),
+            },
+        }
+
+
+async def async_calibrate_curtain(
+    hass: HomeAssistant,
+    entity: "BroadlinkCurtainEntity",
+    end_stop_entity_id: Optional[str] = None,
+    timeout: float = DEFAULT_CALIBRATION_TIMEOUT,
+) -> None:
+    """标定窗帘并把结果写回配置条目."""
+    calibration = CurtainCalibration(hass, entity, end_stop_entity_id, timeout)
+    entity.calibration = calibration
+    try:
+        _LOGGER.info("📏 开始标定窗帘 %s", entity.curtain_name)
+        result = await calibration.async_run()
+    except CalibrationError as ex:
+        _LOGGER.error("❌ 窗帘 %s 标定失败: %s", entity.curtain_name, ex)
+        return
+    except asyncio.CancelledError:
+        _LOGGER.warning("窗帘 %s 标定被取消", entity.curtain_name)
+        raise
+    finally:
+        entity.calibration = None
+
+    # 写回配置条目，实体随之更新行程参数
+    entity.coordinator.async_save_curtain_config(entity.curtain_name, result)
+    # 标定结束时窗帘已关到底
+    entity.set_known_position(0)
+
+    _LOGGER.info(
+        "✅ 窗帘 %s 标定完成: 打开 %.1f 秒, 关闭 %.1f 秒",
+        entity.curtain_name,
+        result[CONF_CURTAIN_OPEN_TIME],
+        result[CONF_CURTAIN_CLOSE_TIME],
+    )
@@ -1,48 +1,152 @@
 """修复的博联窗帘配置流程."""
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
 
 from .const import (
+    CONF_ATTEMPT_TIMEOUT,
     CONF_CURTAINS,
     CONF_CURTAIN_CLOSE_CODE,
     CONF_CURTAIN_CLOSE_TIME,
+    CONF_CURTAIN_END_STOP_MARGIN,
     CONF_CURTAIN_MOVE_TIME,
     CONF_CURTAIN_NAME,
     CONF_CURTAIN_OPEN_CODE,
     CONF_CURTAIN_OPEN_TIME,
+    CONF_CURTAIN_RESYNC_AFTER,
+    CONF_CURTAIN_REVERSE_DELAY,
+    CONF_CURTAIN_STARTUP_LAG,
     CONF_CURTAIN_STOP_CODE,
     CONF_HOST,
     CONF_MAC,
+    CONF_PROGRESS_STEP,
+    CONF_RETRY_JITTER,
+    CONF_SEND_ATTEMPTS,
     CONF_TIMEOUT,
+    DEFAULT_ATTEMPT_TIMEOUT,
+    DEFAULT_END_STOP_MARGIN,
     DEFAULT_MOVE_TIME,
+    DEFAULT_PROGRESS_STEP,
+    DEFAULT_RESYNC_AFTER,
+    DEFAULT_REVERSE_DELAY,
+    DEFAULT_RETRY_JITTER,
+    DEFAULT_SEND_ATTEMPTS,
+    DEFAULT_STARTUP_LAG,
     DEFAULT_TIMEOUT,
     DOMAIN,
 )
+from .coordinator import decode_rf_code
 
 _LOGGER = logging.getLogger(__name__)
 
-# 一步完成所有配置（MAC地址可选，会自动获取）
-STEP_USER_DATA_SCHEMA = vol.Schema(
-    {
-        vol.Required(CONF_HOST): str,
-        vol.Optional(CONF_MAC): str,  # 改为可选
-        vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): vol.All(
-            vol.Coerce(int), vol.Range(min=1, max=60)
-        ),
-        vol.Required(CONF_CURTAIN_NAME): str,
-        vol.Required(CONF_CURTAIN_OPEN_CODE): str,
-        vol.Required(CONF_CURTAIN_CLOSE_CODE): str,
-        vol.Required(CONF_CURTAIN_STOP_CODE): str,
-        vol.Optional(CONF_CURTAIN_MOVE_TIME, default=DEFAULT_MOVE_TIME): vol.All(
-            vol.Coerce(int), vol.Range(min=1, max=300)
-        ),
+# 设备字段
+HUB_FIELDS = {
+    vol.Required(CONF_HOST): str,
+    vol.Optional(CONF_MAC): str,  # 改为可选
+    vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=60)
+    ),
+}
+
+# 发送重试字段（Wi-Fi 拥堵时UDP可能丢包），首次配置和选项中共用
+RETRY_FIELDS = {
+    vol.Optional(CONF_SEND_ATTEMPTS, default=DEFAULT_SEND_ATTEMPTS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=10)
+    ),
+    vol.Optional(CONF_ATTEMPT_TIMEOUT, default=DEFAULT_ATTEMPT_TIMEOUT): vol.All(
+        vol.Coerce(float), vol.Range(min=0.2, max=60)
+    ),
+    vol.Optional(CONF_RETRY_JITTER, default=DEFAULT_RETRY_JITTER): vol.All(
+        vol.Coerce(float), vol.Range(min=0, max=5)
+    ),
+}
+
+# 窗帘字段（首次配置和选项中添加窗帘共用）
+CURTAIN_FIELDS = {
+    vol.Required(CONF_CURTAIN_NAME): str,
+    vol.Required(CONF_CURTAIN_OPEN_CODE): str,
+    vol.Required(CONF_CURTAIN_CLOSE_CODE): str,
+    vol.Required(CONF_CURTAIN_STOP_CODE): str,
+    vol.Optional(CONF_CURTAIN_MOVE_TIME, default=DEFAULT_MOVE_TIME): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=300)
+    ),
+    # 打开/关闭时间不同时单独填写，留空使用移动时间
+    vol.Optional(CONF_CURTAIN_OPEN_TIME): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=300)
+    ),
+    vol.Optional(CONF_CURTAIN_CLOSE_TIME): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=300)
+    ),
+    vol.Optional(CONF_CURTAIN_STARTUP_LAG, default=DEFAULT_STARTUP_LAG): vol.All(
+        vol.Coerce(float), vol.Range(min=0, max=10)
+    ),
+    # 限位校正
+    vol.Optional(CONF_CURTAIN_END_STOP_MARGIN, default=DEFAULT_END_STOP_MARGIN): vol.All(
+        vol.Coerce(float), vol.Range(min=0, max=50)
+    ),
+    vol.Optional(CONF_CURTAIN_RESYNC_AFTER, default=DEFAULT_RESYNC_AFTER): vol.All(
+        vol.Coerce(int), vol.Range(min=0, max=1000)
+    ),
+    vol.Optional(CONF_CURTAIN_REVERSE_DELAY, default=DEFAULT_REVERSE_DELAY): vol.All(
+        vol.Coerce(float), vol.Range(min=0, max=10)
+    ),
+    # 移动过程中发布位置的间隔
+    vol.Optional(CONF_PROGRESS_STEP, default=DEFAULT_PROGRESS_STEP): vol.All(
+        vol.Coerce(int), vol.Range(min=0, max=50)
+    ),
+}
+
+# 一步完成设备和第一个窗帘的配置（MAC地址可选，会自动获取）
+STEP_USER_DATA_SCHEMA = vol.Schema({**HUB_FIELDS, **RETRY_FIELDS, **CURTAIN_FIELDS})
+
+# 选项中添加窗帘
+STEP_ADD_CURTAIN_SCHEMA = vol.Schema(CURTAIN_FIELDS)
+
+
+def _is_valid_rf_code(code: str) -> bool:
+    """验证射频码格式."""
+    try:
+        # 射频码应为十六进制字符串
+        decode_rf_code(code)
+        return True
+    except ValueError:
+        return False
+
+
+def _validate_curtain_input(user_input: Dict[str, Any]) -> Dict[str, str]:
+    """验证窗帘字段，返回错误信息."""
+    errors: Dict[str, str] = {}
+    if not _is_valid_rf_code(user_input[CONF_CURTAIN_OPEN_CODE].strip()):
+        errors[CONF_CURTAIN_OPEN_CODE] = "射频码格式不正确，请使用十六进制格式，如: deadbeef"
+    if not _is_valid_rf_code(user_input[CONF_CURTAIN_CLOSE_CODE].strip()):
+        errors[CONF_CURTAIN_CLOSE_CODE] = "射频码格式不正确，请使用十六进制格式，如: beefdead"
+    if not _is_valid_rf_code(user_input[CONF_CURTAIN_STOP_CODE].strip()):
+        errors[CONF_CURTAIN_STOP_CODE] = "射频码格式不正确，请使用十六进制格式，如: feedface"
+    return errors
+
+
+def _build_curtain_config(user_input: Dict[str, Any]) -> Dict[str, Any]:
+    """根据表单输入创建窗帘配置."""
+    move_time = user_input[CONF_CURTAIN_MOVE_TIME]
+    return {
+        CONF_CURTAIN_NAME: user_input[CONF_CURTAIN_NAME].strip(),
+        CONF_CURTAIN_OPEN_CODE: user_input[CONF_CURTAIN_OPEN_CODE].strip(),
+        CONF_CURTAIN_CLOSE_CODE: user_input[CONF_CURTAIN_CLOSE_CODE].strip(),
+        CONF_CURTAIN_STOP_CODE: user_input[CONF_CURTAIN_STOP_CODE].strip(),
+        CONF_CURTAIN_MOVE_TIME: move_time,
+        CONF_CURTAIN_OPEN_TIME: user_input.get(CONF_CURTAIN_OPEN_TIME, move_time),
+        CONF_CURTAIN_CLOSE_TIME: user_input.get(CONF_CURTAIN_CLOSE_TIME, move_time),
+        CONF_CURTAIN_STARTUP_LAG: user_input[CONF_CURTAIN_STARTUP_LAG],
+        CONF_CURTAIN_END_STOP_MARGIN: user_input[CONF_CURTAIN_END_STOP_MARGIN],
+        CONF_CURTAIN_RESYNC_AFTER: user_input[CONF_CURTAIN_RESYNC_AFTER],
+        CONF_CURTAIN_REVERSE_DELAY: user_input[CONF_CURTAIN_REVERSE_DELAY],
+        CONF_PROGRESS_STEP: user_input[CONF_PROGRESS_STEP],
     }
-)
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -50,6 +154,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "OptionsFlowHandler":
+        """返回选项流程（添加/删除窗帘）."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
@@ -60,9 +172,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # 验证输入格式
             host = user_input[CONF_HOST].strip()
             mac = user_input.get(CONF_MAC, "").strip()
-            open_code = user_input[CONF_CURTAIN_OPEN_CODE].strip()
-            close_code = user_input[CONF_CURTAIN_CLOSE_CODE].strip()
-            stop_code = user_input[CONF_CURTAIN_STOP_CODE].strip()
 
             # 验证IP地址格式
             if not self._is_valid_ip(host):
@@ -81,47 +190,42 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # 验证MAC地址格式（如果有）
             if mac and not self._is_valid_mac(mac):
                 errors[CONF_MAC] = "MAC地址格式不正确，请使用格式如: aa:bb:cc:dd:ee:ff"
+            elif mac:
+                mac = self._normalize_mac(mac)
+                # 每个设备一个配置条目，更多窗帘通过选项添加
+                await self.async_set_unique_id(mac)
+                self._abort_if_unique_id_configured(updates={CONF_HOST: host})
             
             # 验证射频码格式
-            if not self._is_valid_rf_code(open_code):
-                errors[CONF_CURTAIN_OPEN_CODE] = "射频码格式不正确，请使用十六进制格式，如: deadbeef"
-            if not self._is_valid_rf_code(close_code):
-                errors[CONF_CURTAIN_CLOSE_CODE] = "射频码格式不正确，请使用十六进制格式，如: beefdead"
-            if not self._is_valid_rf_code(stop_code):
-                errors[CONF_CURTAIN_STOP_CODE] = "射频码格式不正确，请使用十六进制格式，如: feedface"
+            errors.update(_validate_curtain_input(user_input))
             
             # 如果没有格式错误，尝试连接设备
             if not errors:
                 try:
-                    from .coordinator import BroadlinkCurtainCoordinator
-                    coordinator = BroadlinkCurtainCoordinator(self.hass, None)
-                    coordinator.host = host
-                    coordinator.mac = mac
-                    coordinator.timeout = user_input[CONF_TIMEOUT]
-                    
-                    if await coordinator.async_test_connection():
+                    from .hub import async_acquire_hub, async_release_hub
+                    hub = async_acquire_hub(self.hass, host, mac, user_input[CONF_TIMEOUT])
+                    try:
+                        connected = await hub.async_connect()
+                    finally:
+                        await async_release_hub(self.hass, hub)
+
+                    if connected:
                         # 创建窗帘配置
-                        move_time = user_input[CONF_CURTAIN_MOVE_TIME]
-                        curtain_config = {
-                            CONF_CURTAIN_NAME: user_input[CONF_CURTAIN_NAME],
-                            CONF_CURTAIN_OPEN_CODE: open_code,
-                            CONF_CURTAIN_CLOSE_CODE: close_code,
-                            CONF_CURTAIN_STOP_CODE: stop_code,
-                            CONF_CURTAIN_MOVE_TIME: move_time,
-                            CONF_CURTAIN_OPEN_TIME: move_time,  # 兼容旧版本
-                            CONF_CURTAIN_CLOSE_TIME: move_time,  # 兼容旧版本
-                        }
+                        curtain_config = _build_curtain_config(user_input)
 
                         # 完成配置
                         config_data = {
                             CONF_HOST: host,
                             CONF_MAC: mac,
                             CONF_TIMEOUT: user_input[CONF_TIMEOUT],
+                            CONF_SEND_ATTEMPTS: user_input[CONF_SEND_ATTEMPTS],
+                            CONF_ATTEMPT_TIMEOUT: user_input[CONF_ATTEMPT_TIMEOUT],
+                            CONF_RETRY_JITTER: user_input[CONF_RETRY_JITTER],
                             CONF_CURTAINS: [curtain_config]
                         }
 
                         return self.async_create_entry(
-                            title=f"博联窗帘 - {user_input[CONF_CURTAIN_NAME]}",
+                            title=f"博联窗帘 - {host}",
                             data=config_data
                         )
                     else:
@@ -145,12 +249,15 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 <p><b>关闭射频码:</b> 使用博联App学习的关闭射频码，如 beefdead</p>
                 <p><b>停止射频码:</b> 使用博联App学习的停止射频码，如 feedface</p>
                 <p><b>移动时间:</b> 窗帘完全开启或关闭所需时间，默认30秒</p>
+                <p><b>开启/关闭时间:</b> 开、关速度不同时分别填写，留空使用移动时间</p>
+                <p><b>启动延迟:</b> 电机收到指令到开始移动的延迟，默认0秒</p>
                 <br>
                 <p><b>快速配置方法:</b></p>
                 <p>1. 打开博联官方App，查看设备IP地址</p>
                 <p>2. 学习射频码获取开、关、停三个射频码</p>
                 <p>3. 填写IP地址和射频码，MAC地址会自动获取</p>
                 <p>4. 如果自动获取失败，可手动填写MAC地址</p>
+                <p>5. 同一设备上的其他窗帘在集成的"选项"中添加</p>
                 """
             }
         )
@@ -180,19 +287,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         except:
             return False
     
-    def _is_valid_rf_code(self, code: str) -> bool:
-        """验证射频码格式."""
-        try:
-            # 射频码应为十六进制字符串
-            if not code:
-                return False
-            code = code.replace(' ', '').replace('-', '')
-            if len(code) % 2 != 0:  # 长度必须为偶数
-                return False
-            int(code, 16)  # 验证是否为有效的十六进制
-            return True
-        except:
-            return False
+    def _normalize_mac(self, mac: str) -> str:
+        """把MAC地址统一为 aa:bb:cc:dd:ee:ff 格式."""
+        mac = mac.replace(':', '').replace('-', '').replace(' ', '').lower()
+        return ':'.join(mac[i:i + 2] for i in range(0, 12, 2))
 
     async def _discover_device(self, host: str, timeout: int = 5) -> Optional[str]:
         """通过IP地址自动发现设备并获取MAC地址."""
@@ -244,3 +342,89 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         except Exception as ex:
             _LOGGER.error("❌ 自动发现设备失败: %s", ex, exc_info=True)
             return None
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """选项流程：在同一设备下添加或删除窗帘，调整发送重试参数."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """初始化选项流程."""
+        self._entry = config_entry
+
+    @property
+    def _curtains(self) -> List[Dict[str, Any]]:
+        """返回当前窗帘配置列表."""
+        return list(self._entry.data.get(CONF_CURTAINS, []))
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """选择要执行的操作."""
+        return self.async_show_menu(
+            step_id="init", menu_options=["add_curtain", "remove_curtain", "send_retry"]
+        )
+
+    async def async_step_add_curtain(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """添加窗帘."""
+        errors: Dict[str, str] = {}
+
+        if user_input is not None:
+            errors = _validate_curtain_input(user_input)
+            name = user_input[CONF_CURTAIN_NAME].strip()
+            if any(curtain.get(CONF_CURTAIN_NAME) == name for curtain in self._curtains):
+                errors[CONF_CURTAIN_NAME] = "窗帘名称已存在"
+
+            if not errors:
+                return self._async_save_curtains(
+                    [*self._curtains, _build_curtain_config(user_input)]
+                )
+
+        return self.async_show_form(
+            step_id="add_curtain", data_schema=STEP_ADD_CURTAIN_SCHEMA, errors=errors
+        )
+
+    async def async_step_remove_curtain(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """删除窗帘."""
+        names = [curtain.get(CONF_CURTAIN_NAME) for curtain in self._curtains]
+
+        if user_input is not None:
+            removed = set(user_input[CONF_CURTAINS])
+            return self._async_save_curtains(
+                [curtain for curtain in self._curtains if curtain.get(CONF_CURTAIN_NAME) not in removed]
+            )
+
+        return self.async_show_form(
+            step_id="remove_curtain",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_CURTAINS): cv.multi_select({name: name for name in names})}
+            ),
+        )
+
+    async def async_step_send_retry(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """调整发送重试参数（更新监听器重新加载后生效）."""
+        if user_input is not None:
+            self.hass.config_entries.async_update_entry(
+                self._entry, data={**self._entry.data, **user_input}
+            )
+            return self.async_create_entry(title="", data=dict(self._entry.options))
+
+        # 以当前配置作为默认值
+        schema = {
+            vol.Optional(key.schema, default=self._entry.data.get(key.schema, key.default())): validator
+            for key, validator in RETRY_FIELDS.items()
+        }
+        return self.async_show_form(step_id="send_retry", data_schema=vol.Schema(schema))
+
+    @callback
+    def _async_save_curtains(self, curtains: List[Dict[str, Any]]) -> FlowResult:
+        """把窗帘列表写回配置条目（更新监听器会重新加载实体）."""
+        self.hass.config_entries.async_update_entry(
+            self._entry, data={**self._entry.data, CONF_CURTAINS: curtains}
+        )
+        return self.async_create_entry(title="", data=dict(self._entry.options))
@@ -7,27 +7,58 @@ CONF_HOST = "host"
 CONF_MAC = "mac"
 CONF_TIMEOUT = "timeout"
 CONF_CURTAINS = "curtains"
+CONF_SEND_ATTEMPTS = "send_attempts"  # 每条射频指令最多发送次数
+CONF_ATTEMPT_TIMEOUT = "attempt_timeout"  # 每次发送等待设备确认的时间（秒）
+CONF_RETRY_JITTER = "retry_jitter"  # 重试前随机等待的最长时间（秒）
 
 # 窗帘配置键
 CONF_CURTAIN_NAME = "name"
 CONF_CURTAIN_MOVE_TIME = "move_time"  # 统一的移动时间
-CONF_CURTAIN_OPEN_TIME = "open_time"  # 保留用于兼容
-CONF_CURTAIN_CLOSE_TIME = "close_time"  # 保留用于兼容
+CONF_CURTAIN_OPEN_TIME = "open_time"  # 完全打开所需时间，未设置时使用 move_time
+CONF_CURTAIN_CLOSE_TIME = "close_time"  # 完全关闭所需时间，未设置时使用 move_time
+CONF_CURTAIN_STARTUP_LAG = "startup_lag"  # 电机启动延迟（秒）
+CONF_CURTAIN_POSITION_CURVE = "position_curve"  # 分段线性位置曲线 [[时间%, 位置%], ...]
 CONF_CURTAIN_OPEN_CODE = "open_code"
 CONF_CURTAIN_CLOSE_CODE = "close_code"
 CONF_CURTAIN_STOP_CODE = "stop_code"
+CONF_CURTAIN_CALIBRATION = "calibration"  # 最近一次自动标定的测量结果
+CONF_PROGRESS_STEP = "progress_step"  # 移动过程中发布位置的间隔（百分比）
+CONF_CURTAIN_END_STOP_MARGIN = "end_stop_margin"  # 目标为0%/100%时多运行的时间（全程时间的百分比），顶到限位后校正位置
+CONF_CURTAIN_RESYNC_AFTER = "resync_after"  # 连续部分移动多少次后先到限位校正，0 表示不自动校正
+CONF_CURTAIN_REVERSE_DELAY = "reverse_delay"  # 反向移动前，停止后等待电机停稳的时间（秒）
 
 # 默认值
 DEFAULT_TIMEOUT = 5
+DEFAULT_SEND_ATTEMPTS = 3
+DEFAULT_ATTEMPT_TIMEOUT = 2.0
+DEFAULT_RETRY_JITTER = 0.3
+SEND_TRACE_SIZE = 50  # 诊断中保留的最近发送记录条数，0 表示不记录
+RF_DEDUP_WINDOW = 2.0  # 同一窗帘重复的开/关指令在此时间内（秒）只发送一次
+SET_POSITION_DEBOUNCE = 0.3  # 拖动滑块时，此时间内（秒）连续的位置设置合并为一次
 DEFAULT_MOVE_TIME = 30  # 默认移动时间
 DEFAULT_OPEN_TIME = 30  # 保留用于兼容
 DEFAULT_CLOSE_TIME = 30  # 保留用于兼容
+DEFAULT_STARTUP_LAG = 0.0
+DEFAULT_PROGRESS_STEP = 25  # 每移动25%发布一次位置（自定义卡片按运动参数本地插值）
+DEFAULT_END_STOP_MARGIN = 0
+DEFAULT_RESYNC_AFTER = 0
+DEFAULT_REVERSE_DELAY = 0.5
+DEFAULT_CALIBRATION_TIMEOUT = 300  # 标定时等待每段行程终点的最长时间（秒）
+CONNECT_RETRY_MIN = 5  # 启动时连接失败后的首次重试间隔（秒）
+CONNECT_RETRY_MAX = 300  # 启动重试间隔上限（秒）
+CIRCUIT_FAILURE_THRESHOLD = 3  # 连续失败多少次后断路
 
 # 设备状态
 DEVICE_STATUS_ONLINE = "online"
 DEVICE_STATUS_OFFLINE = "offline"
 DEVICE_STATUS_ERROR = "error"
 
+# 设备连接状态
+HUB_STATE_CONNECTED = "connected"
+HUB_STATE_DEGRADED = "degraded"  # 出现失败，仍正常尝试
+HUB_STATE_OPEN = "open_circuit"  # 断路，退避期内直接失败
+HUB_STATE_HALF_OPEN = "half_open"  # 退避结束，放行一次探测
+
 # 窗帘状态
 CURTAIN_STATE_OPENING = "opening"
 CURTAIN_STATE_CLOSING = "closing"
@@ -1,31 +1,74 @@
 """博联窗帘协调器."""
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-import broadlink
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
+    CONF_ATTEMPT_TIMEOUT,
     CONF_CURTAINS,
+    CONF_CURTAIN_CLOSE_CODE,
+    CONF_CURTAIN_CLOSE_TIME,
+    CONF_CURTAIN_MOVE_TIME,
+    CONF_CURTAIN_NAME,
+    CONF_CURTAIN_OPEN_CODE,
+    CONF_CURTAIN_OPEN_TIME,
+    CONF_CURTAIN_STOP_CODE,
     CONF_HOST,
     CONF_MAC,
+    CONF_RETRY_JITTER,
+    CONF_SEND_ATTEMPTS,
     CONF_TIMEOUT,
-    DEVICE_STATUS_ERROR,
-    DEVICE_STATUS_OFFLINE,
-    DEVICE_STATUS_ONLINE,
+    CONNECT_RETRY_MAX,
+    CONNECT_RETRY_MIN,
+    DEFAULT_ATTEMPT_TIMEOUT,
+    DEFAULT_RETRY_JITTER,
+    DEFAULT_SEND_ATTEMPTS,
     DOMAIN,
+    RF_CODE_CLOSE,
+    RF_CODE_OPEN,
+    RF_CODE_STOP,
 )
+from .hub import BroadlinkHub, async_acquire_hub, async_release_hub
 
 _LOGGER = logging.getLogger(__name__)
 
+# 域级窗帘实体索引: entity_id / unique_id -> (协调器, 实体)
+ENTITY_INDEX = f"{DOMAIN}_entities"
+
+# 射频码类型与配置键的对应关系
+RF_CODE_KEYS = {
+    RF_CODE_OPEN: CONF_CURTAIN_OPEN_CODE,
+    RF_CODE_CLOSE: CONF_CURTAIN_CLOSE_CODE,
+    RF_CODE_STOP: CONF_CURTAIN_STOP_CODE,
+}
+
+
+def decode_rf_code(code: str) -> bytes:
+    """校验并解码十六进制射频码，格式错误时抛出 ValueError."""
+    if not isinstance(code, str):
+        raise ValueError("射频码必须是字符串")
+    code = code.replace(" ", "").replace("-", "")
+    if not code or len(code) % 2 != 0:
+        raise ValueError("射频码长度无效")
+    return bytes.fromhex(code)
+
+
+@callback
+def async_get_curtain(
+    hass: HomeAssistant, entity_id: str
+) -> Optional[Tuple["BroadlinkCurtainCoordinator", Any]]:
+    """按 entity_id 或 unique_id 查找窗帘实体，返回 (协调器, 实体)."""
+    return hass.data.get(ENTITY_INDEX, {}).get(entity_id)
+
 
 class BroadlinkCurtainCoordinator(DataUpdateCoordinator):
     """博联窗帘协调器."""
 
-    def __init__(self, hass: HomeAssistant, entry: Optional[ConfigEntry]):
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
         """初始化协调器."""
         super().__init__(
             hass,
@@ -36,105 +79,245 @@ class BroadlinkCurtainCoordinator(DataUpdateCoordinator):
         
         self.hass = hass
         self.entry = entry
-        self.device = None
-        self.host = None
-        self.mac = None
-        self.timeout = 5
-        
-        if entry:
-            self.host = entry.data.get(CONF_HOST)
-            self.mac = entry.data.get(CONF_MAC)
-            self.timeout = entry.data.get(CONF_TIMEOUT, 5)
-            self.curtains = entry.data.get(CONF_CURTAINS, [])
+        self.host = entry.data.get(CONF_HOST)
+        self.mac = entry.data.get(CONF_MAC)
+        self.timeout = entry.data.get(CONF_TIMEOUT, 5)
+        # 复制一份，配置条目的数据只通过 async_update_entry 更新
+        self.curtains: List[Dict[str, Any]] = [
+            dict(curtain) for curtain in entry.data.get(CONF_CURTAINS, [])
+        ]
+
+        # 窗帘索引: 名称 -> 配置, unique_id -> 名称, entity_id -> 实体
+        self._curtains_by_name: Dict[str, Dict[str, Any]] = {}
+        self._names_by_unique_id: Dict[str, str] = {}
+        self._entities: Dict[str, Any] = {}
+
+        # 预解码的射频码表: (窗帘名称, 射频码类型) -> bytes
+        self.codes: Dict[Tuple[str, str], bytes] = {}
+        for curtain in self.curtains:
+            self._index_curtain(curtain)
+            self.update_curtain_codes(curtain)
+
+        # 同一博联设备的所有配置条目共用一个会话和发送队列
+        self.hub: BroadlinkHub = async_acquire_hub(
+            hass,
+            self.host,
+            self.mac,
+            self.timeout,
+            send_attempts=entry.data.get(CONF_SEND_ATTEMPTS, DEFAULT_SEND_ATTEMPTS),
+            attempt_timeout=entry.data.get(CONF_ATTEMPT_TIMEOUT, DEFAULT_ATTEMPT_TIMEOUT),
+            retry_jitter=entry.data.get(CONF_RETRY_JITTER, DEFAULT_RETRY_JITTER),
+        )
+
+        # 后台连接任务
+        self._connect_task: Optional[asyncio.Task] = None
+
+        # 标定、批量移动等服务启动的后台任务，关闭时取消
+        self._tasks: Set[asyncio.Task] = set()
 
     async def async_test_connection(self) -> bool:
         """测试设备连接."""
-        try:
-            if not self.host or not self.mac:
-                _LOGGER.error("设备配置不完整: host=%s, mac=%s", self.host, self.mac)
-                return False
-            
-            _LOGGER.info("🔌 开始连接博联设备")
-            _LOGGER.info("   - 设备IP: %s", self.host)
-            _LOGGER.info("   - 设备MAC: %s", self.mac)
-            _LOGGER.info("   - 设备类型: RM4 Pro (0x520B)")
-            _LOGGER.info("   - 超时设置: %d 秒", self.timeout)
-                
-            # 创建设备对象
-            self.device = broadlink.rm4(
-                host=(self.host, 80),
-                mac=bytearray.fromhex(self.mac.replace(":", "")),
-                devtype=0x520B,  # RM4 Pro
-                timeout=self.timeout
-            )
-            
-            _LOGGER.info("📡 尝试设备认证...")
-            # 测试连接
-            await self.hass.async_add_executor_job(self.device.auth)
-            
-            _LOGGER.info("✅ 成功连接到博联设备: %s", self.host)
-            _LOGGER.info("   - 连接时间: %s", asyncio.get_event_loop().time())
-            _LOGGER.info("   - 设备状态: 在线")
-            return True
-            
-        except Exception as ex:
-            _LOGGER.error("❌ 连接博联设备失败: %s", ex)
-            _LOGGER.error("   - 错误类型: %s", type(ex).__name__)
-            _LOGGER.error("   - 设备IP: %s", self.host)
-            _LOGGER.error("   - 设备MAC: %s", self.mac)
-            self.device = None
+        if not self.host or not self.mac:
+            _LOGGER.error("设备配置不完整: host=%s, mac=%s", self.host, self.mac)
             return False
+        return await self.hub.async_connect()
 
-    async def async_send_rf_code(self, code: str) -> bool:
-        """发送射频码."""
-        try:
-            if not self.device:
-                _LOGGER.warning("设备未连接，尝试重新连接...")
-                if not await self.async_test_connection():
-                    _LOGGER.error("设备连接失败，无法发送射频码")
-                    return False
-            
-            # 记录发送前的详细信息
-            _LOGGER.info("📡 准备发送射频码")
-            _LOGGER.info("   - 设备IP: %s", self.host)
-            _LOGGER.info("   - 设备MAC: %s", self.mac)
-            _LOGGER.info("   - 射频码: %s", code)
-            _LOGGER.info("   - 射频码长度: %d 字节", len(code) // 2)
-            _LOGGER.info("   - 超时设置: %d 秒", self.timeout)
-            
-            # 发送射频码
-            code_bytes = bytearray.fromhex(code)
-            _LOGGER.info("   - 字节数据: %s", code_bytes.hex())
-            
-            await self.hass.async_add_executor_job(
-                self.device.send_data, code_bytes
+    @callback
+    def async_start(self) -> None:
+        """在后台连接设备，不阻塞配置条目的设置."""
+        if self._connect_task is None or self._connect_task.done():
+            self._connect_task = self.hass.loop.create_task(
+                self._async_connect_with_backoff()
             )
-            
-            _LOGGER.info("✅ 射频码发送成功: %s", code)
-            _LOGGER.info("   - 发送时间: %s", asyncio.get_event_loop().time())
-            return True
-            
-        except Exception as ex:
-            _LOGGER.error("❌ 射频码发送失败: %s", ex)
-            _LOGGER.error("   - 错误类型: %s", type(ex).__name__)
-            _LOGGER.error("   - 射频码: %s", code)
-            _LOGGER.error("   - 设备状态: %s", "已连接" if self.device else "未连接")
+
+    async def _async_connect_with_backoff(self) -> None:
+        """连接设备，失败时按指数退避重试直到成功."""
+        delay = CONNECT_RETRY_MIN
+        while not await self.async_test_connection():
+            _LOGGER.warning("博联设备 %s 暂不可用，%d 秒后重试", self.host, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CONNECT_RETRY_MAX)
+
+    def curtain_unique_id(self, name: str) -> str:
+        """返回窗帘实体的 unique_id."""
+        return f"{self.entry.entry_id}_{name}"
+
+    def _index_curtain(self, curtain: Dict[str, Any]) -> None:
+        """把窗帘加入名称和 unique_id 索引."""
+        name = curtain.get(CONF_CURTAIN_NAME)
+        self._curtains_by_name[name] = curtain
+        self._names_by_unique_id[self.curtain_unique_id(name)] = name
+
+    @property
+    def curtain_names(self) -> List[str]:
+        """返回所有窗帘名称."""
+        return list(self._curtains_by_name)
+
+    def get_curtain_by_unique_id(self, unique_id: str) -> Optional[Dict[str, Any]]:
+        """按 unique_id 获取窗帘配置."""
+        name = self._names_by_unique_id.get(unique_id)
+        return self._curtains_by_name.get(name) if name is not None else None
+
+    @callback
+    def register_entity(self, entity: Any) -> None:
+        """实体加入 Home Assistant 后登记到 entity_id 索引和域级索引."""
+        self._entities[entity.entity_id] = entity
+        index = self.hass.data.setdefault(ENTITY_INDEX, {})
+        index[entity.entity_id] = (self, entity)
+        index[entity.unique_id] = (self, entity)
+
+    @callback
+    def unregister_entity(self, entity: Any) -> None:
+        """实体移除（包括修改 entity_id）时从索引中删除."""
+        if self._entities.get(entity.entity_id) is entity:
+            del self._entities[entity.entity_id]
+        index = self.hass.data.get(ENTITY_INDEX, {})
+        for key in (entity.entity_id, entity.unique_id):
+            if key in index and index[key][1] is entity:
+                del index[key]
+
+    @property
+    def entities(self) -> List[Any]:
+        """返回已加入 Home Assistant 的窗帘实体."""
+        return list(self._entities.values())
+
+    def get_entity(self, entity_id: str) -> Optional[Any]:
+        """按 entity_id 获取窗帘实体."""
+        return self._entities.get(entity_id)
+
+    def update_curtain_codes(self, curtain: Dict[str, Any]) -> bool:
+        """解码窗帘的射频码并写入射频码表，全部有效时返回 True."""
+        name = curtain.get(CONF_CURTAIN_NAME)
+        valid = True
+        for command, key in RF_CODE_KEYS.items():
+            try:
+                self.codes[(name, command)] = decode_rf_code(curtain.get(key))
+            except ValueError as ex:
+                self.codes.pop((name, command), None)
+                _LOGGER.error("窗帘 %s 的%s射频码无效: %s", name, command, ex)
+                valid = False
+        return valid
+
+    @callback
+    def async_save_curtain_config(self, name: str, updates: Dict[str, Any]) -> bool:
+        """更新窗帘配置并写回配置条目.
+
+        开/关时间变化时同步 move_time，射频码变化时重新解码，
+        已加入 Home Assistant 的实体就地更新参数，
+        不重新加载平台，也不重新连接设备。
+        """
+        curtain = self.get_curtain_config(name)
+        if curtain is None:
+            return False
+
+        # 生成新的配置字典，不修改配置条目中的数据，
+        # 否则 async_update_entry 比较新旧数据时认为没有变化而不保存
+        updated = {**curtain, **updates}
+
+        # move_time 是统一的移动时间（旧配置只有这一项），开/关时间变化时同步为较长的一个
+        if CONF_CURTAIN_OPEN_TIME in updates or CONF_CURTAIN_CLOSE_TIME in updates:
+            times = [
+                updated[key]
+                for key in (CONF_CURTAIN_OPEN_TIME, CONF_CURTAIN_CLOSE_TIME)
+                if updated.get(key)
+            ]
+            if times:
+                updated[CONF_CURTAIN_MOVE_TIME] = max(times)
+
+        self.curtains = [updated if item is curtain else item for item in self.curtains]
+        self._index_curtain(updated)
+
+        self.hass.config_entries.async_update_entry(
+            self.entry,
+            data={
+                **self.entry.data,
+                CONF_CURTAINS: [dict(item) for item in self.curtains],
+            },
+        )
+
+        if any(key in updates for key in RF_CODE_KEYS.values()):
+            self.update_curtain_codes(updated)
+
+        for entity in self._entities.values():
+            if entity.curtain_name == name:
+                entity.apply_curtain_config(updated)
+        return True
+
+    def get_rf_code(self, curtain: str, command: str) -> Optional[bytes]:
+        """返回预解码的射频码."""
+        return self.codes.get((curtain, command))
+
+    async def async_send_curtain_command(self, curtain: str, command: str) -> bool:
+        """发送窗帘的开/关/停指令."""
+        code = self.codes.get((curtain, command))
+        if code is None:
+            _LOGGER.error("窗帘 %s 没有有效的%s射频码", curtain, command)
             return False
+        # 队列按 unique_id 合并指令，不同配置条目的同名窗帘互不影响
+        return await self.hub.tx_queue.async_send(
+            code, self.curtain_unique_id(curtain), command
+        )
+
+    async def async_send_rf_code(
+        self,
+        code: bytes,
+        curtain: Optional[str] = None,
+        command: Optional[str] = None,
+    ) -> bool:
+        """通过发送队列发送射频码.
+
+        curtain 和 command 用于队列中的优先级与指令合并，
+        未指定 command 时按普通指令排队发送，不会取代该窗帘尚未发出的开/关指令。
+        """
+        key = self.curtain_unique_id(curtain) if curtain is not None else None
+        return await self.hub.tx_queue.async_send(code, key, command)
+
+    @property
+    def tx_stats(self) -> Dict[str, Any]:
+        """返回发送队列统计信息."""
+        return self.hub.stats
+
+    @property
+    def rf_latency(self) -> Optional[float]:
+        """返回设备的射频发送延迟（秒）."""
+        return self.hub.rf_latency
+
+    @property
+    def rf_emit_delay(self) -> float:
+        """返回从开始发送到射频信号实际发出的预估延迟（秒）."""
+        return self.hub.rf_emit_delay
+
+    @callback
+    def record_stop_drift(self, planned: float) -> None:
+        """停止指令已确认，记录信号实际发出时间与计划时间（loop.time()）的误差."""
+        emitted = self.hass.loop.time() - self.hub.rf_emit_delay
+        self.hub.record_stop_drift(emitted - planned)
+
+    @callback
+    def async_track_task(self, task: "asyncio.Task[Any]") -> None:
+        """登记使用本设备的后台任务，协调器关闭时取消."""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def async_close(self) -> None:
+        """关闭协调器，取消后台任务并释放共享的设备会话."""
+        if self._connect_task is not None and not self._connect_task.done():
+            self._connect_task.cancel()
+        self._connect_task = None
+
+        # 等待任务结束（标定会发送停止指令）后再释放会话
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        await async_release_hub(self.hass, self.hub)
 
     async def async_get_device_status(self) -> str:
         """获取设备状态."""
-        try:
-            if not self.device:
-                if not await self.async_test_connection():
-                    return DEVICE_STATUS_OFFLINE
-            
-            # 检查设备状态
-            await self.hass.async_add_executor_job(self.device.check_temperature)
-            return DEVICE_STATUS_ONLINE
-            
-        except Exception as ex:
-            _LOGGER.error("获取设备状态失败: %s", ex)
-            return DEVICE_STATUS_ERROR
+        return await self.hub.async_get_status()
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """更新数据."""
@@ -143,7 +326,7 @@ class BroadlinkCurtainCoordinator(DataUpdateCoordinator):
             
             return {
                 "device_status": status,
-                "curtains": self.curtains if hasattr(self, 'curtains') else []
+                "curtains": self.curtains
             }
             
         except Exception as ex:
@@ -152,10 +335,4 @@ class BroadlinkCurtainCoordinator(DataUpdateCoordinator):
 
     def get_curtain_config(self, curtain_id: str) -> Optional[Dict[str, Any]]:
         """获取窗帘配置."""
-        if not hasattr(self, 'curtains'):
-            return None
-            
-        for curtain in self.curtains:
-            if curtain.get("name") == curtain_id:
-                return curtain
-        return None
+        return self._curtains_by_name.get(curtain_id)
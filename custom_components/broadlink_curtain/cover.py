@@ -1,37 +1,49 @@
 """博联窗帘控制实体."""
 import asyncio
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
 
 from homeassistant.components.cover import (
+    ATTR_CURRENT_POSITION,
     ATTR_POSITION,
     CoverDeviceClass,
     CoverEntity,
     CoverEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import (
-    CONF_CURTAIN_CLOSE_CODE,
     CONF_CURTAIN_CLOSE_TIME,
+    CONF_CURTAIN_END_STOP_MARGIN,
     CONF_CURTAIN_MOVE_TIME,
     CONF_CURTAIN_NAME,
-    CONF_CURTAIN_OPEN_CODE,
     CONF_CURTAIN_OPEN_TIME,
-    CONF_CURTAIN_STOP_CODE,
+    CONF_CURTAIN_RESYNC_AFTER,
+    CONF_CURTAIN_REVERSE_DELAY,
+    CONF_PROGRESS_STEP,
     CURTAIN_STATE_CLOSED,
     CURTAIN_STATE_CLOSING,
     CURTAIN_STATE_OPEN,
     CURTAIN_STATE_OPENING,
     CURTAIN_STATE_STOPPED,
+    DEFAULT_END_STOP_MARGIN,
+    DEFAULT_PROGRESS_STEP,
+    DEFAULT_RESYNC_AFTER,
+    DEFAULT_REVERSE_DELAY,
     DOMAIN,
+    RF_CODE_CLOSE,
+    RF_CODE_OPEN,
+    RF_CODE_STOP,
+    SET_POSITION_DEBOUNCE,
 )
 from .coordinator import BroadlinkCurtainCoordinator
+from .motion import CurtainMotion, TravelProfile
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -55,35 +67,86 @@ async def async_setup_entry(
 class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
     """博联窗帘实体."""
 
+    # 移动过程中变化的属性不写入历史数据库
+    _unrecorded_attributes = frozenset(
+        {
+            "target_position",
+            "motion_start",
+            "motion_start_position",
+            "motion_target",
+            "motion_velocity",
+            "rf_queue_depth",
+            "rf_queue_wait_ms",
+            "hub_state",
+        }
+    )
+
     def __init__(self, coordinator: BroadlinkCurtainCoordinator, config: Dict[str, Any]):
         """初始化窗帘实体."""
         super().__init__(coordinator)
 
         self._config = config
         self._name = config[CONF_CURTAIN_NAME]
-        self._open_code = config[CONF_CURTAIN_OPEN_CODE]
-        self._close_code = config[CONF_CURTAIN_CLOSE_CODE]
-        self._stop_code = config[CONF_CURTAIN_STOP_CODE]
-
-        # 使用统一的移动时间，如果没有则使用旧的配置
-        self._move_time = config.get(CONF_CURTAIN_MOVE_TIME) or config.get(CONF_CURTAIN_OPEN_TIME, 30)
-        self._open_time = self._move_time  # 兼容
-        self._close_time = self._move_time  # 兼容
+        self._load_config()
+        self._moves_since_resync = 0
 
         # 状态变量
         self._position = 0  # 0-100，默认关闭
         self._current_state = CURTAIN_STATE_STOPPED
         self._target_position = None
         self._move_task = None
+        self._motion: Optional[CurtainMotion] = None
+        self._motion_attrs: Optional[Tuple[CurtainMotion, Dict[str, Any]]] = None
+        self._deadline_handle: Optional[asyncio.TimerHandle] = None
+        self._progress_handle: Optional[asyncio.TimerHandle] = None
+        self._debounce_handle: Optional[asyncio.TimerHandle] = None
+        self._pending_target: Optional[int] = None
+        self._start_direction: Optional[int] = None  # 开/关指令正在发送时的方向
+        self._stop_pending = False  # 运动模型只保留到即将发出的停止指令
         self._last_manual_update = None  # 记录最后一次手动更新时间
+        self.calibration = None  # 正在进行的行程标定
 
         # 实体属性
         self._attr_name = self._name
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_{self._name}"
+        self._attr_unique_id = coordinator.curtain_unique_id(self._name)
         self._attr_device_class = CoverDeviceClass.CURTAIN
         # 支持的功能会根据位置动态更新
         self._update_supported_features()
 
+    def _load_config(self) -> None:
+        """从窗帘配置读取移动参数."""
+        config = self._config
+
+        # 使用统一的移动时间，如果没有则使用旧的配置
+        self._move_time = config.get(CONF_CURTAIN_MOVE_TIME) or config.get(CONF_CURTAIN_OPEN_TIME, 30)
+
+        # 行程标定参数（打开/关闭时间、启动延迟、位置曲线）
+        try:
+            profile = TravelProfile.from_config(config)
+        except ValueError as ex:
+            _LOGGER.error("窗帘 %s 的行程标定参数无效，使用线性模型: %s", self._name, ex)
+            profile = TravelProfile(self._move_time, self._move_time)
+        self.apply_travel_profile(profile)
+
+        # 移动过程中每隔多少百分比发布一次中间位置，0 表示只发布起止状态
+        self._progress_step = config.get(CONF_PROGRESS_STEP, DEFAULT_PROGRESS_STEP)
+
+        # 限位校正: 目标为0%/100%时多运行一段时间顶到限位，
+        # 连续部分移动达到次数后先到最近的限位校正再移动到目标
+        self._end_stop_margin = config.get(CONF_CURTAIN_END_STOP_MARGIN, DEFAULT_END_STOP_MARGIN)
+        self._resync_after = config.get(CONF_CURTAIN_RESYNC_AFTER, DEFAULT_RESYNC_AFTER)
+
+        # 移动中反向时，停止后等待电机停稳再反向
+        self._reverse_delay = config.get(CONF_CURTAIN_REVERSE_DELAY, DEFAULT_REVERSE_DELAY)
+
+    @callback
+    def apply_curtain_config(self, config: Dict[str, Any]) -> None:
+        """窗帘配置已更新，重新读取移动参数，正在进行的移动不受影响."""
+        self._config = config
+        self._load_config()
+        if self.hass is not None:
+            self.async_write_ha_state()
+
     def _update_supported_features(self) -> None:
         """根据当前位置更新支持的功能."""
         # 始终显示所有按钮：打开、关闭、停止、设置位置
@@ -95,34 +158,47 @@ class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
         )
 
         self._attr_supported_features = features
-        _LOGGER.debug("🔧 窗帘 %s - 位置: %d%%, 所有按钮始终可用",
-                     self._name, self._position)
 
     async def async_added_to_hass(self) -> None:
         """实体添加到Home Assistant时调用."""
         await super().async_added_to_hass()
+        self.coordinator.register_entity(self)
 
         # 恢复之前的状态
         last_state = await self.async_get_last_state()
         if last_state is not None:
             # 恢复位置
-            if last_state.attributes.get(ATTR_POSITION) is not None:
-                self._position = last_state.attributes.get(ATTR_POSITION)
-                _LOGGER.info("🔄 恢复窗帘 %s 的位置: %d%%", self._name, self._position)
+            if last_state.attributes.get(ATTR_CURRENT_POSITION) is not None:
+                self._position = last_state.attributes.get(ATTR_CURRENT_POSITION)
 
             # 恢复最后更新时间
             if last_state.attributes.get("last_manual_update"):
                 self._last_manual_update = last_state.attributes.get("last_manual_update")
-                _LOGGER.info("🔄 恢复窗帘 %s 的最后更新时间: %s", self._name, self._last_manual_update)
-        else:
-            _LOGGER.info("🆕 窗帘 %s 首次初始化，位置设为 0%%", self._name)
+
+            # 恢复部分移动计数
+            if last_state.attributes.get("moves_since_resync") is not None:
+                self._moves_since_resync = last_state.attributes.get("moves_since_resync")
+        _LOGGER.debug(
+            "restore curtain=%s restored=%s position=%d",
+            self._name,
+            last_state is not None,
+            self._position,
+        )
 
         # 更新支持的功能
         self._update_supported_features()
 
+    async def async_will_remove_from_hass(self) -> None:
+        """实体移除时取消移动定时器."""
+        self._cancel_move()
+        self.coordinator.unregister_entity(self)
+        await super().async_will_remove_from_hass()
+
     @property
     def current_cover_position(self) -> Optional[int]:
-        """返回当前位置."""
+        """返回当前位置（移动中按时间插值计算）."""
+        if self._motion is not None:
+            return int(round(self._motion.position_at(self.hass.loop.time())))
         return self._position
 
     @property
@@ -145,7 +221,7 @@ class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
         """返回是否已关闭."""
         # 位置为0时返回True（已关闭）
         # 其他位置返回False（未关闭/部分打开/已打开）
-        return self._position == 0
+        return self.current_cover_position == 0
 
     @property
     def available(self) -> bool:
@@ -155,19 +231,50 @@ class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
-        """返回额外的状态属性."""
-        attrs = {
-            "current_position": self._position,
-            "target_position": self._target_position,
-            "current_state": self._current_state,
-            "move_time": self._move_time,
-        }
+        """返回额外的状态属性.
+
+        位置和运行状态已由标准的 current_position 属性和实体状态提供，不再重复。
+        """
+        # 配置和校正相关的属性，很少变化
+        attrs: Dict[str, Any] = {"move_time": self._move_time}
 
         if self._last_manual_update:
             attrs["last_manual_update"] = self._last_manual_update
 
+        if self._resync_after:
+            attrs["moves_since_resync"] = self._moves_since_resync
+
+        # 运动参数，前端卡片据此在本地计算移动中的位置
+        if self._motion is not None:
+            attrs.update(self._motion_attributes(self._motion))
+
+        # 以下为不写入历史数据库的临时属性
+        if self._target_position is not None:
+            attrs["target_position"] = self._target_position
+
+        # 发送队列状态
+        tx_stats = self.coordinator.tx_stats
+        attrs["rf_queue_depth"] = tx_stats["queue_depth"]
+        attrs["rf_queue_wait_ms"] = tx_stats["queue_wait_last_ms"]
+        attrs["hub_state"] = tx_stats["connection_state"]
+
         return attrs
 
+    def _motion_attributes(self, motion: CurtainMotion) -> Dict[str, Any]:
+        """返回运动参数属性，每次移动只计算一次，开始时间换算为 Unix 时间戳."""
+        if self._motion_attrs is None or self._motion_attrs[0] is not motion:
+            started = time.time() - (self.hass.loop.time() - motion.start_time)
+            self._motion_attrs = (
+                motion,
+                {
+                    "motion_start": round(started, 3),
+                    "motion_start_position": round(motion.start_position, 1),
+                    "motion_target": motion.target_position,
+                    "motion_velocity": round(motion.velocity, 3),
+                },
+            )
+        return self._motion_attrs[1]
+
     async def async_open_cover(self, **kwargs: Any) -> None:
         """打开窗帘."""
         await self.async_set_cover_position(position=100)
@@ -176,13 +283,53 @@ class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
         """关闭窗帘."""
         await self.async_set_cover_position(position=0)
 
+    @property
+    def curtain_name(self) -> str:
+        """返回窗帘名称（射频码表中的键）."""
+        return self._name
+
+    @property
+    def travel_profile(self) -> TravelProfile:
+        """返回行程标定参数."""
+        return self._profile
+
+    @callback
+    def apply_travel_profile(self, profile: TravelProfile) -> None:
+        """更新行程标定参数，下一次移动生效."""
+        self._profile = profile
+        self._open_time = profile.open_time
+        self._close_time = profile.close_time
+
+    @callback
+    def set_known_position(self, position: int) -> None:
+        """取消正在进行的移动并把位置设为已知值."""
+        self._cancel_move()
+        self._position = position
+        self._moves_since_resync = 0
+        self._current_state = CURTAIN_STATE_STOPPED
+        self._target_position = None
+        self._update_supported_features()
+        self.async_write_ha_state()
+
+    @callback
+    def set_calibration_state(self, state: str) -> None:
+        """标定过程中更新运行状态."""
+        self._cancel_move()
+        self._current_state = state
+        self.async_write_ha_state()
+
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """停止窗帘."""
-        if self._move_task and not self._move_task.done():
-            self._move_task.cancel()
+        if self.calibration is not None:
+            _LOGGER.warning("窗帘 %s 正在标定，请使用 calibration_mark 标记终点", self._name)
+            return
 
-        # 发送停止指令
-        await self.coordinator.async_send_rf_code(self._stop_code)
+        # 保留运动模型，按停止信号实际发出的时间计算停止位置
+        self._cancel_move(keep_motion=True)
+        await self.async_stop_motor()
+        if self._move_task is not None:
+            # 停止期间已开始新的移动
+            return
 
         self._current_state = CURTAIN_STATE_STOPPED
         self._target_position = None
@@ -190,41 +337,264 @@ class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
         self.async_write_ha_state()
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
-        """设置窗帘位置."""
+        """设置窗帘位置（短时间内的连续设置合并为最后一次）."""
         position = kwargs.get(ATTR_POSITION)
         if position is None:
             return
-        
-        # 取消之前的移动任务
+
+        if self.calibration is not None:
+            _LOGGER.warning("窗帘 %s 正在标定，忽略位置设置", self._name)
+            return
+
+        self._pending_target = position
+        if self._debounce_handle is not None:
+            self._debounce_handle.cancel()
+        self._debounce_handle = self.hass.loop.call_later(
+            SET_POSITION_DEBOUNCE, self._apply_pending_target
+        )
+
+    @callback
+    def _apply_pending_target(self) -> None:
+        """防抖结束，移动到最后一次设置的位置."""
+        self._debounce_handle = None
+        target_position = self._pending_target
+        self._pending_target = None
+        if target_position is None or self._retarget(target_position):
+            return
+
+        # 移动中（包括开/关指令正在发送）需要先停止再按新目标移动，
+        # 运动模型保留到停止指令发出，以便计算准确的停止位置
+        moving = self._current_state in (CURTAIN_STATE_OPENING, CURTAIN_STATE_CLOSING)
+        self._cancel_move(keep_motion=moving)
+        if not moving and target_position == self._position:
+            return
+
+        self._target_position = target_position
+        self._move_task = self.hass.async_create_task(
+            self._async_move_to_position(target_position, stop_first=moving)
+        )
+
+    @callback
+    def _retarget(self, target_position: int) -> bool:
+        """同方向移动中更改目标时只调整停止时间，不重发开/关指令.
+
+        开/关指令排队或发送中时只更新目标，发送完成后按新目标建立运动模型；
+        批量移动或限位校正中的运动改由实体自己的停止定时器接管。成功时返回 True。
+        """
+        loop = self.hass.loop
+        motion = self._motion
+        if motion is None:
+            direction = self._start_direction
+            if direction is None:
+                return False
+            position: float = self._position
+        else:
+            # 停止指令即将或已经发出
+            emit_delay = self.coordinator.rf_emit_delay
+            if self._stop_pending or loop.time() >= self.stop_time(motion) - emit_delay:
+                return False
+            direction = motion.direction
+            position = motion.position_at(loop.time())
+
+        if target_position == position or (target_position > position) != (direction > 0):
+            return False
+
+        self._target_position = target_position
+        if motion is None:
+            _LOGGER.debug(
+                "retarget_pending curtain=%s to=%d", self._name, target_position
+            )
+            self.async_write_ha_state()
+            return True
+
+        # 保持原来的起点和启动时间，只重新计算终点
+        retargeted = self._profile.plan(
+            motion.start_position, target_position, motion.start_time
+        )
+        self._motion = retargeted
+
+        if self._deadline_handle is not None:
+            self._deadline_handle.cancel()
+        self._deadline_handle = loop.call_at(
+            self.stop_time(retargeted) - self.coordinator.rf_emit_delay,
+            self._handle_move_deadline,
+        )
+        if self._progress_handle is not None:
+            self._progress_handle.cancel()
+            self._progress_handle = None
+        self._schedule_progress_update()
+
+        _LOGGER.debug(
+            "retarget curtain=%s from=%d to=%d",
+            self._name,
+            int(motion.target_position),
+            target_position,
+        )
+        self.async_write_ha_state()
+        return True
+
+    @callback
+    def _cancel_move(self, keep_motion: bool = False) -> None:
+        """取消正在进行的移动，并把位置固定在当前插值位置.
+
+        keep_motion 为 True 时只取消定时器和任务，运动模型由随后的停止指令结束。
+        """
+        if self._debounce_handle is not None:
+            self._debounce_handle.cancel()
+            self._debounce_handle = None
+        self._pending_target = None
+        self._start_direction = None
+        self._stop_pending = keep_motion and self._motion is not None
+
+        if self._motion is not None and not keep_motion:
+            self._position = self.current_cover_position
+            self._motion = None
+
+        if self._deadline_handle is not None:
+            self._deadline_handle.cancel()
+            self._deadline_handle = None
+        if self._progress_handle is not None:
+            self._progress_handle.cancel()
+            self._progress_handle = None
+
         if self._move_task and not self._move_task.done():
             self._move_task.cancel()
-        
-        # 计算移动方向和距离
-        current_pos = self._position
-        target_pos = position
-        
-        if target_pos == current_pos:
+        self._move_task = None
+
+    async def async_stop_motor(self) -> None:
+        """发送停止指令，按信号发出的时间把位置固定为运动模型的插值位置."""
+        motion = self._motion
+        await self.coordinator.async_send_curtain_command(self._name, RF_CODE_STOP)
+        if motion is None or self._motion is not motion:
             return
-        
-        # 启动移动任务
-        self._target_position = target_pos
-        self._move_task = asyncio.create_task(
-            self._async_move_to_position(target_pos)
+
+        self._stop_pending = False
+        stopped_at = self.hass.loop.time() - self.coordinator.rf_emit_delay
+        self._position = int(round(motion.position_at(stopped_at)))
+        self._motion = None
+
+    def _needs_resync(self, target_position: int) -> bool:
+        """判断移动前是否需要先到限位校正位置."""
+        return (
+            self._resync_after > 0
+            and self._end_stop_margin > 0
+            and target_position not in (0, 100)
+            and self._moves_since_resync >= self._resync_after
         )
 
-    async def _async_move_to_position(self, target_position: int) -> None:
-        """移动到指定位置."""
+    async def _async_resync_end_stop(self) -> bool:
+        """先移动到最近的限位并顶到底，校正位置后返回 True."""
+        end_position = 0 if self._position < 50 else 100
+        if end_position == 100:
+            command, self._current_state = RF_CODE_OPEN, CURTAIN_STATE_OPENING
+        else:
+            command, self._current_state = RF_CODE_CLOSE, CURTAIN_STATE_CLOSING
+        self.async_write_ha_state()
+
+        _LOGGER.debug(
+            "resync curtain=%s end=%d moves_since_resync=%d",
+            self._name,
+            end_position,
+            self._moves_since_resync,
+        )
+        if not await self.coordinator.async_send_curtain_command(self._name, command):
+            self.abort_move()
+            return False
+
+        loop = self.hass.loop
+        emit_delay = self.coordinator.rf_emit_delay
+        motion = self.begin_motion(end_position, loop.time() - emit_delay)
+        await asyncio.sleep(max(0.0, self.stop_time(motion) - emit_delay - loop.time()))
+        if self._motion is not motion:
+            return False
+
+        if await self.coordinator.async_send_curtain_command(self._name, RF_CODE_STOP):
+            self.coordinator.record_stop_drift(self.stop_time(motion))
+        self.complete_motion(motion)
+        return True
+
+    async def _async_move_to_position(
+        self, target_position: int, stop_first: bool = False
+    ) -> None:
+        """发送开/关指令并启动运动模型，stop_first 时先停止当前移动."""
         try:
-            current_pos = self._position
-            target_pos = target_position
-            
-            if target_pos > current_pos:
-                # 需要打开
-                await self._async_move_open(target_pos - current_pos)
+            if stop_first:
+                _LOGGER.debug(
+                    "stop_before_move curtain=%s position=%d to=%d",
+                    self._name,
+                    self.current_cover_position,
+                    target_position,
+                )
+                await self.async_stop_motor()
+                if target_position == self._position:
+                    self._current_state = CURTAIN_STATE_STOPPED
+                    self._target_position = None
+                    self.async_write_ha_state()
+                    return
+
+                # 等待电机停稳后再反向
+                if self._reverse_delay > 0:
+                    await asyncio.sleep(self._reverse_delay)
+
+            if self._needs_resync(target_position):
+                if not await self._async_resync_end_stop():
+                    return
+                self._target_position = target_position
+
+                # 从限位返回目标总是反向移动，等待电机停稳
+                if target_position != self._position and self._reverse_delay > 0:
+                    await asyncio.sleep(self._reverse_delay)
+
+            start_position = self._position
+            distance = abs(target_position - start_position)
+            if distance <= 0:
+                return
+
+            if target_position > start_position:
+                command = RF_CODE_OPEN
+                state = CURTAIN_STATE_OPENING
             else:
-                # 需要关闭
-                await self._async_move_close(current_pos - target_pos)
-                
+                command = RF_CODE_CLOSE
+                state = CURTAIN_STATE_CLOSING
+
+            # 按标定参数计算移动时间
+            move_time = self._profile.move_duration(start_position, target_position)
+
+            _LOGGER.debug(
+                "move_start curtain=%s command=%s from=%d to=%d duration=%.2f",
+                self._name,
+                command,
+                start_position,
+                target_position,
+                move_time,
+            )
+
+            self._current_state = state
+            self.async_write_ha_state()
+
+            # 发送期间同方向的新目标只更新 _target_position
+            self._start_direction = 1 if command == RF_CODE_OPEN else -1
+            success = await self.coordinator.async_send_curtain_command(self._name, command)
+            self._start_direction = None
+            target_position = self._target_position
+            if not success:
+                _LOGGER.warning("窗帘 %s 的%s指令发送失败，取消移动", self._name, command)
+                self._current_state = CURTAIN_STATE_STOPPED
+                self._target_position = None
+                self.async_write_ha_state()
+                return
+
+            # 以单调时钟为基准：射频信号在确认返回前已发出，
+            # 按协调器测得的发送延迟回推电机实际启动时间
+            loop = self.hass.loop
+            emit_delay = self.coordinator.rf_emit_delay
+            motion = self.begin_motion(target_position, loop.time() - emit_delay)
+
+            # 只安排一个到期定时器，停止指令提前发出以抵消发送延迟
+            self._deadline_handle = loop.call_at(
+                self.stop_time(motion) - emit_delay, self._handle_move_deadline
+            )
+
         except asyncio.CancelledError:
             _LOGGER.debug("窗帘移动任务被取消")
         except Exception as ex:
@@ -232,144 +602,154 @@ class BroadlinkCurtainEntity(CoordinatorEntity, CoverEntity, RestoreEntity):
             self._current_state = CURTAIN_STATE_STOPPED
             self.async_write_ha_state()
 
-    async def _async_move_open(self, percentage: int) -> None:
-        """打开指定百分比."""
-        if percentage <= 0:
-            _LOGGER.warning("窗帘 %s 打开百分比无效: %d%%", self._name, percentage)
-            return
-
-        # 计算移动时间
-        total_time = self._move_time
-        move_time = (percentage / 100.0) * total_time
-
-        start_position = self._position
-        target_position = min(100, self._position + percentage)
+    @property
+    def motion(self) -> Optional[CurtainMotion]:
+        """返回正在进行的运动模型."""
+        return self._motion
 
-        _LOGGER.info("🔄 开始打开窗帘 %s", self._name)
-        _LOGGER.info("   - 当前位置: %d%%", start_position)
-        _LOGGER.info("   - 目标位置: %d%%", target_position)
-        _LOGGER.info("   - 移动距离: %d%%", percentage)
-        _LOGGER.info("   - 预计时间: %.1f 秒", move_time)
-        _LOGGER.info("   - 开启射频码: %s", self._open_code)
-        _LOGGER.info("   - 停止射频码: %s", self._stop_code)
+    @property
+    def reverse_delay(self) -> float:
+        """返回停止后再次启动前等待电机停稳的时间（秒）."""
+        return self._reverse_delay
+
+    @callback
+    def prepare_move(self, target_position: int) -> bool:
+        """为外部调度的移动做准备，需要移动时返回 True.
+
+        移动中的窗帘保留运动模型，调度方需要先调用 async_stop_motor 停止，
+        再用 start_command 取得开/关指令。
+        """
+        if self.calibration is not None:
+            _LOGGER.warning("窗帘 %s 正在标定，忽略位置设置", self._name)
+            return False
+
+        moving = self._current_state in (CURTAIN_STATE_OPENING, CURTAIN_STATE_CLOSING)
+        self._cancel_move(keep_motion=moving)
+        if not moving and target_position == self._position:
+            return False
+
+        self._target_position = target_position
+        return True
 
-        # 发送打开指令
-        self._current_state = CURTAIN_STATE_OPENING
-        self.async_write_ha_state()
+    @callback
+    def start_command(self, target_position: int) -> Optional[str]:
+        """返回从当前位置移动到目标需要发送的开/关指令.
 
-        _LOGGER.info("📡 发送开启指令...")
-        success = await self.coordinator.async_send_rf_code(self._open_code)
-        if not success:
-            _LOGGER.error("❌ 开启指令发送失败，停止操作")
+        已在目标位置（例如停止后正好停在目标）时恢复停止状态并返回 None。
+        """
+        if target_position == self._position:
             self._current_state = CURTAIN_STATE_STOPPED
+            self._target_position = None
             self.async_write_ha_state()
-            return
-
-        # 实时更新进度
-        _LOGGER.info("⏱️ 开始移动，实时更新进度...")
-        update_interval = 0.5  # 每0.5秒更新一次
-        elapsed_time = 0.0
+            return None
 
-        while elapsed_time < move_time:
-            await asyncio.sleep(update_interval)
-            elapsed_time += update_interval
-
-            # 计算当前预估位置
-            progress = min(1.0, elapsed_time / move_time)
-            estimated_position = int(start_position + (percentage * progress))
-            self._position = min(100, estimated_position)
+        if target_position > self._position:
+            command = RF_CODE_OPEN
+            self._current_state = CURTAIN_STATE_OPENING
+        else:
+            command = RF_CODE_CLOSE
+            self._current_state = CURTAIN_STATE_CLOSING
+        self._target_position = target_position
+        self.async_write_ha_state()
+        return command
+
+    @callback
+    def begin_motion(self, target_position: int, start_time: float) -> CurtainMotion:
+        """开/关指令已发出，从当前位置启动运动模型."""
+        motion = self._profile.plan(self._position, target_position, start_time)
+        self._motion = motion
+        self._stop_pending = False
+        if target_position not in (0, 100):
+            self._moves_since_resync += 1
+        # 发布一次运动参数，中间位置由前端卡片插值
+        self.async_write_ha_state()
+        self._schedule_progress_update()
+        return motion
+
+    def stop_time(self, motion: CurtainMotion) -> float:
+        """返回应发出停止信号的时间，目标为限位时按配置多运行一段时间."""
+        if self._end_stop_margin and motion.target_position in (0, 100):
+            travel_time = self._profile.travel_time(motion.direction)
+            return motion.end_time + travel_time * self._end_stop_margin / 100
+        return motion.end_time
+
+    @callback
+    def abort_move(self) -> None:
+        """开/关指令发送失败，恢复停止状态."""
+        self._cancel_move()
+        self._current_state = CURTAIN_STATE_STOPPED
+        self._target_position = None
+        self.async_write_ha_state()
 
-            # 更新状态
-            self.async_write_ha_state()
-            _LOGGER.debug("📊 窗帘 %s 打开进度: %d%% (%.1f秒/%.1f秒)",
-                         self._name, self._position, elapsed_time, move_time)
+    @callback
+    def complete_motion(self, motion: CurtainMotion) -> None:
+        """停止指令已发出，把位置更新为运动终点."""
+        if self._motion is not motion:
+            return
 
-        _LOGGER.info("🛑 发送停止指令...")
-        # 发送停止指令
-        await self.coordinator.async_send_rf_code(self._stop_code)
+        if self._progress_handle is not None:
+            self._progress_handle.cancel()
+            self._progress_handle = None
 
-        # 更新最终位置
-        old_position = start_position
-        self._position = target_position
+        # 更新最终位置，顶到限位后的位置是准确的，部分移动计数清零
+        self._motion = None
+        self._position = int(motion.target_position)
+        if self._end_stop_margin and self._position in (0, 100):
+            self._moves_since_resync = 0
         self._current_state = CURTAIN_STATE_STOPPED
         self._target_position = None
 
-        _LOGGER.info("✅ 窗帘 %s 打开完成", self._name)
-        _LOGGER.info("   - 原位置: %d%%", old_position)
-        _LOGGER.info("   - 新位置: %d%%", self._position)
-        _LOGGER.info("   - 实际移动: %d%%", self._position - old_position)
+        _LOGGER.debug(
+            "move_done curtain=%s from=%d to=%d",
+            self._name,
+            int(motion.start_position),
+            self._position,
+        )
 
         # 更新支持的功能
         self._update_supported_features()
         self.async_write_ha_state()
 
-    async def _async_move_close(self, percentage: int) -> None:
-        """关闭指定百分比."""
-        if percentage <= 0:
-            _LOGGER.warning("窗帘 %s 关闭百分比无效: %d%%", self._name, percentage)
+    @callback
+    def _schedule_progress_update(self, after: Optional[int] = None) -> None:
+        """安排下一次中间位置发布，after 为上一次发布的整步位置."""
+        motion = self._motion
+        if motion is None:
             return
 
-        # 计算移动时间
-        total_time = self._move_time
-        move_time = (percentage / 100.0) * total_time
-
-        start_position = self._position
-        target_position = max(0, self._position - percentage)
+        now = self.hass.loop.time()
+        next_position = motion.next_step_position(now, self._progress_step, after)
+        if next_position is None:
+            return
 
-        _LOGGER.info("🔄 开始关闭窗帘 %s", self._name)
-        _LOGGER.info("   - 当前位置: %d%%", start_position)
-        _LOGGER.info("   - 目标位置: %d%%", target_position)
-        _LOGGER.info("   - 移动距离: %d%%", percentage)
-        _LOGGER.info("   - 预计时间: %.1f 秒", move_time)
-        _LOGGER.info("   - 关闭射频码: %s", self._close_code)
-        _LOGGER.info("   - 停止射频码: %s", self._stop_code)
+        self._progress_handle = self.hass.loop.call_at(
+            motion.time_at(next_position), self._handle_progress_update, next_position
+        )
 
-        # 发送关闭指令
-        self._current_state = CURTAIN_STATE_CLOSING
+    @callback
+    def _handle_progress_update(self, position: int) -> None:
+        """发布中间位置."""
+        self._progress_handle = None
         self.async_write_ha_state()
-
-        _LOGGER.info("📡 发送关闭指令...")
-        success = await self.coordinator.async_send_rf_code(self._close_code)
-        if not success:
-            _LOGGER.error("❌ 关闭指令发送失败，停止操作")
-            self._current_state = CURTAIN_STATE_STOPPED
-            self.async_write_ha_state()
+        self._schedule_progress_update(position)
+
+    @callback
+    def _handle_move_deadline(self) -> None:
+        """到达预计时间，发送停止指令."""
+        self._deadline_handle = None
+        self._move_task = self.hass.async_create_task(self._async_finish_move())
+
+    async def _async_finish_move(self) -> None:
+        """发送停止指令并更新最终位置."""
+        motion = self._motion
+        if motion is None:
             return
 
-        # 实时更新进度
-        _LOGGER.info("⏱️ 开始移动，实时更新进度...")
-        update_interval = 0.5  # 每0.5秒更新一次
-        elapsed_time = 0.0
-
-        while elapsed_time < move_time:
-            await asyncio.sleep(update_interval)
-            elapsed_time += update_interval
-
-            # 计算当前预估位置
-            progress = min(1.0, elapsed_time / move_time)
-            estimated_position = int(start_position - (percentage * progress))
-            self._position = max(0, estimated_position)
-
-            # 更新状态
-            self.async_write_ha_state()
-            _LOGGER.debug("📊 窗帘 %s 关闭进度: %d%% (%.1f秒/%.1f秒)",
-                         self._name, self._position, elapsed_time, move_time)
-
-        _LOGGER.info("🛑 发送停止指令...")
-        # 发送停止指令
-        await self.coordinator.async_send_rf_code(self._stop_code)
-
-        # 更新最终位置
-        old_position = start_position
-        self._position = target_position
-        self._current_state = CURTAIN_STATE_STOPPED
-        self._target_position = None
-
-        _LOGGER.info("✅ 窗帘 %s 关闭完成", self._name)
-        _LOGGER.info("   - 原位置: %d%%", old_position)
-        _LOGGER.info("   - 新位置: %d%%", self._position)
-        _LOGGER.info("   - 实际移动: %d%%", old_position - self._position)
+        try:
+            if await self.coordinator.async_send_curtain_command(self._name, RF_CODE_STOP):
+                self.coordinator.record_stop_drift(self.stop_time(motion))
+        except asyncio.CancelledError:
+            _LOGGER.debug("窗帘停止任务被取消")
+            return
 
-        # 更新支持的功能
-        self._update_supported_features()
-        self.async_write_ha_state()
+        self.complete_motion(motion)
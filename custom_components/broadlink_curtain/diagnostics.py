@@ -0,0 +1,46 @@
+"""博联窗帘诊断信息."""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_CURTAIN_CLOSE_CODE,
+    CONF_CURTAIN_OPEN_CODE,
+    CONF_CURTAIN_STOP_CODE,
+    DOMAIN,
+)
+
+# 射频码可以直接重放，不写入诊断文件
+TO_REDACT = {CONF_CURTAIN_OPEN_CODE, CONF_CURTAIN_CLOSE_CODE, CONF_CURTAIN_STOP_CODE}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """返回配置条目的诊断信息."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    hub = coordinator.hub
+
+    curtains = {}
+    for entity in coordinator.entities:
+        curtains[entity.curtain_name] = {
+            "entity_id": entity.entity_id,
+            "position": entity.current_cover_position,
+            "moving": entity.motion is not None,
+            "travel_profile": entity.travel_profile.as_dict(),
+        }
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "hub": {
+            "host": hub.host,
+            "refcount": hub.refcount,
+            "stats": hub.stats,
+            "send_latency_ms": hub.send_latency.as_dict(),
+            "stop_drift_ms": hub.stop_drift.as_dict(),
+        },
+        "curtains": curtains,
+        "send_trace": hub.trace,
+    }
@@ -0,0 +1,103 @@
+"""博联窗帘批量移动调度."""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import RF_CODE_STOP
+from .motion import CurtainMotion
+
+if TYPE_CHECKING:
+    from .cover import BroadlinkCurtainEntity
+    from .hub import BroadlinkHub
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def _async_run_hub_timeline(
+    hass: HomeAssistant,
+    moves: List[Tuple["BroadlinkCurtainEntity", int]],
+) -> None:
+    """在同一设备的时间线上执行一组移动.
+
+    先停止正在移动的窗帘并等待电机停稳，然后开/关指令依次连续发送，
+    随后按计算出的到期时间依次发送停止指令。
+    """
+    loop = hass.loop
+    timeline: List[Tuple[float, "BroadlinkCurtainEntity", CurtainMotion]] = []
+
+    # 停止位置按停止信号发出的时间计算
+    settle = 0.0
+    for entity, _ in moves:
+        if entity.is_opening or entity.is_closing:
+            await entity.async_stop_motor()
+            settle = max(settle, entity.reverse_delay)
+
+    # 等待电机停稳后再发送新的开/关指令
+    if settle > 0:
+        await asyncio.sleep(settle)
+
+    for entity, target in moves:
+        command = entity.start_command(target)
+        if command is None:
+            continue
+
+        coordinator = entity.coordinator
+        if not await coordinator.async_send_curtain_command(entity.curtain_name, command):
+            _LOGGER.error("❌ 窗帘 %s 的指令发送失败，跳过", entity.curtain_name)
+            entity.abort_move()
+            continue
+
+        emit_delay = coordinator.rf_emit_delay
+        motion = entity.begin_motion(target, loop.time() - emit_delay)
+        timeline.append((entity.stop_time(motion) - emit_delay, entity, motion))
+
+    timeline.sort(key=lambda item: item[0])
+    for deadline, entity, motion in timeline:
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        # 移动期间窗帘可能已被其他指令接管
+        if entity.motion is not motion:
+            continue
+
+        if await entity.coordinator.async_send_curtain_command(entity.curtain_name, RF_CODE_STOP):
+            entity.coordinator.record_stop_drift(entity.stop_time(motion))
+        entity.complete_motion(motion)
+
+
+async def async_move_group(
+    hass: HomeAssistant,
+    moves: Sequence[Tuple["BroadlinkCurtainEntity", int]],
+) -> None:
+    """把多个窗帘同时移动到各自的目标位置.
+
+    每个设备只有一条调度时间线（多个配置条目共用同一设备时也合并），
+    整组移动由一个任务驱动，不再为每个窗帘单独创建移动任务。
+    """
+    hubs: Dict["BroadlinkHub", List[Tuple["BroadlinkCurtainEntity", int]]] = {}
+    for entity, target in moves:
+        if entity.prepare_move(target):
+            hubs.setdefault(entity.coordinator.hub, []).append((entity, target))
+
+    if not hubs:
+        return
+
+    _LOGGER.debug(
+        "move_group curtains=%d hubs=%d",
+        sum(len(items) for items in hubs.values()),
+        len(hubs),
+    )
+
+    try:
+        await asyncio.gather(
+            *(
+                _async_run_hub_timeline(hass, items)
+                for items in hubs.values()
+            )
+        )
+    except asyncio.CancelledError:
+        _LOGGER.debug("批量移动任务被取消")
+        raise
@@ -0,0 +1,393 @@
+"""博联设备共享会话."""
+import asyncio
+from collections import deque
+import logging
+import random
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CONNECT_RETRY_MAX,
+    CONNECT_RETRY_MIN,
+    DEFAULT_ATTEMPT_TIMEOUT,
+    DEFAULT_RETRY_JITTER,
+    DEFAULT_SEND_ATTEMPTS,
+    DEVICE_STATUS_ERROR,
+    DEVICE_STATUS_OFFLINE,
+    DEVICE_STATUS_ONLINE,
+    DOMAIN,
+    HUB_STATE_CONNECTED,
+    HUB_STATE_DEGRADED,
+    HUB_STATE_HALF_OPEN,
+    HUB_STATE_OPEN,
+    RF_CODE_STOP,
+    SEND_TRACE_SIZE,
+)
+from .metrics import LatencyHistogram
+from .protocol import DEVTYPE_RM4_PRO, BroadlinkSession
+from .transmit import RFTransmitQueue
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data 中保存共享设备的键: MAC -> BroadlinkHub
+DATA_HUBS = f"{DOMAIN}_hubs"
+
+# 发送延迟滑动平均系数
+RF_LATENCY_SMOOTHING = 0.2
+
+
+def _hub_key(mac: str) -> str:
+    """返回设备在注册表中的键（去掉分隔符的小写MAC）."""
+    return mac.replace(":", "").replace("-", "").lower()
+
+
+class BroadlinkHub:
+    """一个物理博联设备的共享会话.
+
+    同一设备的所有配置条目共用一个认证会话和一个射频发送队列，
+    避免重复认证和并发发送冲突。由 async_acquire_hub/async_release_hub 引用计数管理。
+
+    连接带断路器: 连续失败的指令数达到阈值后断路，退避期内的发送直接失败
+    （停止指令仍发送一次），退避结束后放行一次探测，探测成功恢复连接，
+    失败则加倍退避时间。
+
+    发送带重试: 每次发送等待设备确认 attempt_timeout 秒，
+    未确认时随机等待最多 retry_jitter 秒后重发，最多发送 send_attempts 次。
+    """
+
+    def __init__(
+        self,
+        host: str,
+        mac: str,
+        timeout: int,
+        send_attempts: int = DEFAULT_SEND_ATTEMPTS,
+        attempt_timeout: float = DEFAULT_ATTEMPT_TIMEOUT,
+        retry_jitter: float = DEFAULT_RETRY_JITTER,
+    ):
+        """初始化共享会话."""
+        self.key = _hub_key(mac)
+        self.host = host
+        self.mac = mac
+        self.timeout = timeout
+        self.set_send_options(send_attempts, attempt_timeout, retry_jitter)
+        self.refcount = 0
+
+        self.session = BroadlinkSession(
+            host=host,
+            mac=bytes.fromhex(self.key),
+            devtype=DEVTYPE_RM4_PRO,
+            timeout=timeout,
+        )
+        self._connect_lock = asyncio.Lock()
+
+        # 射频发送延迟（从发出请求到设备确认）的指数滑动平均，单位秒
+        self.rf_latency: Optional[float] = None
+
+        # 每个设备一个发送队列，串行发送射频码
+        self.tx_queue = RFTransmitQueue(host, self._async_transmit)
+
+        # 断路器状态
+        self.state = HUB_STATE_DEGRADED
+        self.consecutive_failures = 0
+        self._backoff = CONNECT_RETRY_MIN
+        self._retry_at = 0.0
+
+        # 发送统计
+        self.acked_count = 0
+        self.retry_count = 0
+        self.failed_count = 0
+        self.connect_count = 0
+        self.send_latency = LatencyHistogram()  # 单次发送到设备确认的时间
+        self.stop_drift = LatencyHistogram()  # 停止信号实际发出时间与计划时间之差
+
+        # 最近发送记录（环形缓冲），通过诊断信息查看
+        self._trace: Optional[Deque[Dict[str, Any]]] = (
+            deque(maxlen=SEND_TRACE_SIZE) if SEND_TRACE_SIZE else None
+        )
+
+    def set_send_options(
+        self, send_attempts: int, attempt_timeout: float, retry_jitter: float
+    ) -> None:
+        """设置发送重试参数，下一次发送生效."""
+        self.send_attempts = max(1, send_attempts)
+        self.attempt_timeout = min(attempt_timeout, self.timeout)
+        self.retry_jitter = retry_jitter
+
+    @property
+    def connected(self) -> bool:
+        """返回会话是否已认证."""
+        return self.session.connected
+
+    async def async_connect(self) -> bool:
+        """认证设备，已认证时直接返回."""
+        async with self._connect_lock:
+            if self.session.connected:
+                return True
+
+            try:
+                await self.session.async_auth()
+            except Exception as ex:
+                _LOGGER.warning(
+                    "连接博联设备失败: host=%s mac=%s error=%s(%s)",
+                    self.host,
+                    self.mac,
+                    type(ex).__name__,
+                    ex,
+                )
+                self.session.close()
+                self._record_failure()
+                return False
+
+            _LOGGER.info("✅ 已连接博联设备: host=%s mac=%s", self.host, self.mac)
+            self.connect_count += 1
+            self._record_success()
+            return True
+
+    def _allow_request(self) -> bool:
+        """断路器判断是否放行本次请求."""
+        if self.state not in (HUB_STATE_OPEN, HUB_STATE_HALF_OPEN):
+            return True
+
+        now = asyncio.get_running_loop().time()
+        if now < self._retry_at:
+            return False
+        # 退避结束，放行一次探测，探测期间其余请求仍直接失败
+        self.state = HUB_STATE_HALF_OPEN
+        self._retry_at = now + self._backoff
+        return True
+
+    def _record_success(self) -> None:
+        """记录一次成功，恢复连接状态."""
+        if self.consecutive_failures:
+            _LOGGER.info("✅ 博联设备 %s 连接恢复", self.host)
+        self.state = HUB_STATE_CONNECTED
+        self.consecutive_failures = 0
+        self._backoff = CONNECT_RETRY_MIN
+
+    def _record_failure(self) -> None:
+        """记录一次失败，达到阈值或探测失败时断路."""
+        self.consecutive_failures += 1
+        if (
+            self.state == HUB_STATE_HALF_OPEN
+            or self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD
+        ):
+            if self.state == HUB_STATE_HALF_OPEN:
+                self._backoff = min(self._backoff * 2, CONNECT_RETRY_MAX)
+            self.state = HUB_STATE_OPEN
+            self._retry_at = asyncio.get_running_loop().time() + self._backoff
+            _LOGGER.warning(
+                "博联设备 %s 连续失败 %d 次，%d 秒内的发送将直接失败",
+                self.host,
+                self.consecutive_failures,
+                self._backoff,
+            )
+        else:
+            self.state = HUB_STATE_DEGRADED
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """返回发送队列、延迟和连接状态统计信息."""
+        stats = self.tx_queue.stats
+        stats["rf_latency_ms"] = (
+            round(self.rf_latency * 1000, 1) if self.rf_latency is not None else None
+        )
+        stats["send_acked"] = self.acked_count
+        stats["send_retries"] = self.retry_count
+        stats["send_failed"] = self.failed_count
+        stats["reconnects"] = max(0, self.connect_count - 1)
+        latency = self.send_latency.as_dict()
+        stats["send_latency_p50_ms"] = latency["p50"]
+        stats["send_latency_p95_ms"] = latency["p95"]
+        stats["send_latency_p99_ms"] = latency["p99"]
+        stats["stop_drift_p95_ms"] = self.stop_drift.as_dict()["p95"]
+        stats["connection_state"] = self.state
+        stats["consecutive_failures"] = self.consecutive_failures
+        stats["circuit_retry_in"] = (
+            max(0.0, round(self._retry_at - asyncio.get_running_loop().time(), 1))
+            if self.state in (HUB_STATE_OPEN, HUB_STATE_HALF_OPEN)
+            else None
+        )
+        return stats
+
+    @property
+    def rf_emit_delay(self) -> float:
+        """返回从开始发送到射频信号实际发出的预估延迟（秒）.
+
+        设备在发出射频信号后才返回确认，按测得往返延迟的一半估算。
+        """
+        if self.rf_latency is None:
+            return 0.0
+        return self.rf_latency / 2
+
+    def record_stop_drift(self, drift: float) -> None:
+        """记录停止信号的定时误差（秒，早于计划为负）."""
+        self.stop_drift.record(abs(drift) * 1000)
+
+    def _record_rf_latency(self, latency: float) -> None:
+        """记录一次发送延迟."""
+        if self.rf_latency is None:
+            self.rf_latency = latency
+        else:
+            self.rf_latency += RF_LATENCY_SMOOTHING * (latency - self.rf_latency)
+
+    @property
+    def trace(self) -> List[Dict[str, Any]]:
+        """返回最近的发送记录（从旧到新）."""
+        return list(self._trace) if self._trace is not None else []
+
+    async def _async_transmit(
+        self,
+        code: bytes,
+        send_id: int,
+        curtain: Optional[str] = None,
+        command: Optional[str] = None,
+    ) -> bool:
+        """实际发送射频码（仅由发送队列调用），设备确认后返回 True."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempts = 0
+        error: Optional[str] = None
+        result = False
+
+        allowed = self._allow_request()
+        max_attempts = self.send_attempts
+        if not allowed:
+            # 断路期间停止指令仍尝试发送一次，避免窗帘无法停下
+            max_attempts = 1 if command == RF_CODE_STOP else 0
+            error = "circuit_open"
+
+        if max_attempts:
+            for attempt in range(1, max_attempts + 1):
+                if attempt > 1:
+                    self.retry_count += 1
+                    await asyncio.sleep(random.uniform(0, self.retry_jitter))
+                attempts = attempt
+
+                try:
+                    if not self.session.connected and not await self.async_connect():
+                        error = "connect_failed"
+                        break
+
+                    # 发送预解码的射频码，设备响应即为确认
+                    sent_at = loop.time()
+                    await self.session.async_send_data(code, self.attempt_timeout)
+                    latency = loop.time() - sent_at
+                    self._record_rf_latency(latency)
+                    self.send_latency.record(latency * 1000)
+                    self._record_success()
+                    self.acked_count += 1
+                    error = None
+                    result = True
+                    break
+
+                except Exception as ex:
+                    error = f"{type(ex).__name__}: {ex}"
+                    _LOGGER.debug("射频码 #%d 第 %d 次发送失败: %s", send_id, attempt, error)
+
+            # 每条指令用完所有重试后只记一次失败（连接失败已在认证时记录）
+            if not result and allowed and error != "connect_failed":
+                self._record_failure()
+
+        elapsed = loop.time() - started
+        if not result:
+            self.failed_count += 1
+            _LOGGER.warning(
+                "射频码发送失败: host=%s id=%d curtain=%s command=%s attempts=%d error=%s",
+                self.host,
+                send_id,
+                curtain,
+                command,
+                attempts,
+                error,
+            )
+        elif _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "rf_send host=%s id=%d curtain=%s command=%s bytes=%d attempts=%d elapsed_ms=%.1f",
+                self.host,
+                send_id,
+                curtain,
+                command,
+                len(code),
+                attempts,
+                elapsed * 1000,
+            )
+
+        if self._trace is not None:
+            self._trace.append(
+                {
+                    "id": send_id,
+                    "time": time.time(),
+                    "curtain": curtain,
+                    "command": command,
+                    "bytes": len(code),
+                    "attempts": attempts,
+                    "elapsed_ms": round(elapsed * 1000, 1),
+                    "result": result,
+                    "error": error,
+                }
+            )
+        return result
+
+    async def async_get_status(self) -> str:
+        """获取设备状态."""
+        if not self._allow_request():
+            return DEVICE_STATUS_OFFLINE
+
+        try:
+            if not self.session.connected:
+                if not await self.async_connect():
+                    return DEVICE_STATUS_OFFLINE
+
+            # 检查设备状态
+            await self.session.async_check_sensors()
+            self._record_success()
+            return DEVICE_STATUS_ONLINE
+
+        except Exception as ex:
+            _LOGGER.warning("获取设备状态失败: host=%s error=%s", self.host, ex)
+            self._record_failure()
+            return DEVICE_STATUS_ERROR
+
+    async def async_close(self) -> None:
+        """停止发送队列并关闭会话."""
+        await self.tx_queue.async_close()
+        self.session.close()
+
+
+@callback
+def async_acquire_hub(
+    hass: HomeAssistant, host: str, mac: str, timeout: int, **options: Any
+) -> BroadlinkHub:
+    """获取（必要时创建）设备的共享会话并增加引用计数.
+
+    options 为发送重试参数，同一设备的多个配置条目以最后加载的为准。
+    """
+    hubs: Dict[str, BroadlinkHub] = hass.data.setdefault(DATA_HUBS, {})
+    key = _hub_key(mac)
+    hub = hubs.get(key)
+    if hub is None:
+        hub = BroadlinkHub(host, mac, timeout, **options)
+        hubs[key] = hub
+    else:
+        if hub.host != host:
+            _LOGGER.warning("设备 %s 已使用地址 %s 连接，忽略新地址 %s", mac, hub.host, host)
+        if options:
+            hub.set_send_options(**options)
+
+    hub.refcount += 1
+    return hub
+
+
+async def async_release_hub(hass: HomeAssistant, hub: BroadlinkHub) -> None:
+    """释放共享会话，最后一个使用者释放时关闭会话."""
+    hub.refcount -= 1
+    if hub.refcount > 0:
+        return
+
+    hubs: Dict[str, BroadlinkHub] = hass.data.get(DATA_HUBS, {})
+    if hubs.get(hub.key) is hub:
+        del hubs[hub.key]
+    await hub.async_close()
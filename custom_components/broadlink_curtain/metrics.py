@@ -0,0 +1,68 @@
+"""博联窗帘性能统计."""
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence
+
+# 默认桶上界（毫秒），覆盖局域网发送延迟和定时误差的常见范围
+DEFAULT_BUCKETS_MS = (
+    5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000,
+)
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图.
+
+    内存占用固定，记录为 O(log 桶数)，分位数在所在桶内线性插值，
+    超出最大桶的值按记录到的最大值估算。
+    """
+
+    __slots__ = ("_bounds", "_counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS_MS):
+        """初始化直方图."""
+        self._bounds = tuple(bounds)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """记录一个值（毫秒）."""
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """返回第 q 分位数的估计值（q 取 0-1），无数据时返回 None."""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            if not bucket_count or seen + bucket_count < rank:
+                seen += bucket_count
+                continue
+            if index == len(self._bounds):
+                return self.max
+            lower = self._bounds[index - 1] if index else 0.0
+            upper = min(self._bounds[index], self.max)
+            fraction = (rank - seen) / bucket_count
+            return lower + (upper - lower) * max(0.0, fraction)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        """返回常用分位数."""
+
+        def _round(value: Optional[float]) -> Optional[float]:
+            return round(value, 1) if value is not None else None
+
+        return {
+            "count": self.count,
+            "avg": _round(self.total / self.count) if self.count else None,
+            "p50": _round(self.percentile(0.5)),
+            "p95": _round(self.percentile(0.95)),
+            "p99": _round(self.percentile(0.99)),
+            "max": _round(self.max) if self.count else None,
+        }
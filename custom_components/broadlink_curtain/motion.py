@@ -0,0 +1,237 @@
+"""博联窗帘运动模型."""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from .const import (
+    CONF_CURTAIN_CLOSE_TIME,
+    CONF_CURTAIN_MOVE_TIME,
+    CONF_CURTAIN_OPEN_TIME,
+    CONF_CURTAIN_POSITION_CURVE,
+    CONF_CURTAIN_STARTUP_LAG,
+    DEFAULT_MOVE_TIME,
+)
+
+# 时间→位置查找表的采样数
+_POSITION_LUT_SIZE = 200
+
+
+def _lerp_table(table: Sequence[float], index: float) -> float:
+    """在等间距查找表中线性插值."""
+    last = len(table) - 1
+    if index <= 0:
+        return table[0]
+    if index >= last:
+        return table[last]
+    low = int(index)
+    frac = index - low
+    return table[low] + (table[low + 1] - table[low]) * frac
+
+
+def _normalize_curve(curve: Optional[Sequence[Sequence[float]]]) -> List[List[float]]:
+    """校验位置曲线并补齐端点，曲线点为 [时间百分比, 位置百分比]."""
+    points = [[0.0, 0.0]]
+    for point in curve or []:
+        if len(point) != 2:
+            raise ValueError("位置曲线的每个点必须是 [时间百分比, 位置百分比]")
+        time_pct, pos_pct = float(point[0]), float(point[1])
+        if not 0 < time_pct < 100 or not 0 < pos_pct < 100:
+            raise ValueError("位置曲线的中间点必须在 0-100 之间")
+        if time_pct <= points[-1][0] or pos_pct <= points[-1][1]:
+            raise ValueError("位置曲线必须单调递增")
+        points.append([time_pct, pos_pct])
+    points.append([100.0, 100.0])
+    return points
+
+
+class TravelProfile:
+    """单个窗帘的行程标定参数.
+
+    包含打开/关闭各自的全程时间、电机启动延迟，以及可选的分段线性位置曲线
+    （全程时间百分比 → 位置百分比，以打开方向定义，关闭方向按时间镜像）。
+    位置与行程时间的换算通过预先计算的查找表完成，均为 O(1)。
+    """
+
+    def __init__(
+        self,
+        open_time: float,
+        close_time: float,
+        startup_lag: float = 0.0,
+        curve: Optional[Sequence[Sequence[float]]] = None,
+    ):
+        """初始化标定参数，参数无效时抛出 ValueError."""
+        if open_time <= 0 or close_time <= 0:
+            raise ValueError("行程时间必须大于0")
+        if startup_lag < 0:
+            raise ValueError("启动延迟不能为负数")
+
+        self.open_time = float(open_time)
+        self.close_time = float(close_time)
+        self.startup_lag = float(startup_lag)
+        self.curve = _normalize_curve(curve)
+
+        # 位置(0-100整数) → 打开行程时间比例
+        self._stroke_lut = [self._invert_curve(position) for position in range(101)]
+        # 打开行程时间比例(等间距采样) → 位置
+        self._position_lut = [
+            self._evaluate_curve(index * 100.0 / _POSITION_LUT_SIZE)
+            for index in range(_POSITION_LUT_SIZE + 1)
+        ]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TravelProfile":
+        """从窗帘配置创建标定参数（兼容只有 move_time 的旧配置）."""
+        move_time = config.get(CONF_CURTAIN_MOVE_TIME) or DEFAULT_MOVE_TIME
+        return cls(
+            open_time=config.get(CONF_CURTAIN_OPEN_TIME) or move_time,
+            close_time=config.get(CONF_CURTAIN_CLOSE_TIME) or move_time,
+            startup_lag=config.get(CONF_CURTAIN_STARTUP_LAG) or 0.0,
+            curve=config.get(CONF_CURTAIN_POSITION_CURVE),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """返回可保存到配置条目的参数."""
+        return {
+            CONF_CURTAIN_OPEN_TIME: self.open_time,
+            CONF_CURTAIN_CLOSE_TIME: self.close_time,
+            CONF_CURTAIN_STARTUP_LAG: self.startup_lag,
+            CONF_CURTAIN_POSITION_CURVE: [list(point) for point in self.curve[1:-1]],
+        }
+
+    def _evaluate_curve(self, time_pct: float) -> float:
+        """曲线求值：时间百分比 → 位置百分比."""
+        points = self.curve
+        for (t0, p0), (t1, p1) in zip(points, points[1:]):
+            if time_pct <= t1:
+                return p0 + (p1 - p0) * (time_pct - t0) / (t1 - t0)
+        return 100.0
+
+    def _invert_curve(self, position: float) -> float:
+        """曲线求逆：位置百分比 → 时间比例(0-1)."""
+        points = self.curve
+        for (t0, p0), (t1, p1) in zip(points, points[1:]):
+            if position <= p1:
+                return (t0 + (t1 - t0) * (position - p0) / (p1 - p0)) / 100.0
+        return 1.0
+
+    def travel_time(self, direction: int) -> float:
+        """返回指定方向的全程时间."""
+        return self.open_time if direction > 0 else self.close_time
+
+    def stroke_at(self, position: float, direction: int) -> float:
+        """返回到达指定位置时的行程时间比例(0-1)."""
+        stroke = _lerp_table(self._stroke_lut, position)
+        return stroke if direction > 0 else 1.0 - stroke
+
+    def position_at_stroke(self, stroke: float, direction: int) -> float:
+        """返回行程时间比例(0-1)对应的位置."""
+        if direction < 0:
+            stroke = 1.0 - stroke
+        return _lerp_table(self._position_lut, stroke * _POSITION_LUT_SIZE)
+
+    def move_duration(self, start_position: float, target_position: float) -> float:
+        """返回从起点移动到终点所需时间（含启动延迟）."""
+        if target_position == start_position:
+            return 0.0
+        direction = 1 if target_position > start_position else -1
+        stroke = self.stroke_at(target_position, direction) - self.stroke_at(
+            start_position, direction
+        )
+        return self.startup_lag + stroke * self.travel_time(direction)
+
+    def plan(
+        self, start_position: float, target_position: float, start_time: float
+    ) -> "CurtainMotion":
+        """生成一次移动的运动模型."""
+        return CurtainMotion(self, start_position, target_position, start_time)
+
+
+class CurtainMotion:
+    """一次移动的运动模型.
+
+    只记录起点、终点和开始时间，当前位置在读取时按标定参数插值计算，
+    不需要周期性地更新状态。时间使用事件循环的单调时钟 (loop.time())。
+    """
+
+    __slots__ = (
+        "profile",
+        "start_position",
+        "target_position",
+        "start_time",
+        "duration",
+        "direction",
+        "_start_stroke",
+        "_travel_time",
+    )
+
+    def __init__(
+        self,
+        profile: TravelProfile,
+        start_position: float,
+        target_position: float,
+        start_time: float,
+    ):
+        """初始化运动模型."""
+        self.profile = profile
+        self.start_position = start_position
+        self.target_position = target_position
+        self.start_time = start_time
+        self.direction = 1 if target_position >= start_position else -1
+        self.duration = profile.move_duration(start_position, target_position)
+        self._start_stroke = profile.stroke_at(start_position, self.direction)
+        self._travel_time = profile.travel_time(self.direction)
+
+    @property
+    def end_time(self) -> float:
+        """返回预计到达目标位置的时间."""
+        return self.start_time + self.duration
+
+    @property
+    def velocity(self) -> float:
+        """返回平均移动速度（百分比/秒，带方向）."""
+        if self.duration <= 0:
+            return 0.0
+        return (self.target_position - self.start_position) / self.duration
+
+    def position_at(self, now: float) -> float:
+        """返回指定时间的预估位置."""
+        if self.duration <= 0 or now >= self.end_time:
+            return float(self.target_position)
+        elapsed = now - self.start_time - self.profile.startup_lag
+        if elapsed <= 0:
+            return float(self.start_position)
+        stroke = self._start_stroke + elapsed / self._travel_time
+        return self.profile.position_at_stroke(stroke, self.direction)
+
+    def time_at(self, position: float) -> float:
+        """返回到达指定位置的时间."""
+        if self.duration <= 0:
+            return self.start_time
+        if self.direction > 0:
+            position = min(max(position, self.start_position), self.target_position)
+        else:
+            position = max(min(position, self.start_position), self.target_position)
+        stroke = self.profile.stroke_at(position, self.direction) - self._start_stroke
+        return self.start_time + self.profile.startup_lag + stroke * self._travel_time
+
+    def next_step_position(
+        self, now: float, step: int, after: Optional[float] = None
+    ) -> Optional[int]:
+        """返回从当前时间起下一个需要发布的整步位置，已无中间步时返回 None.
+
+        after 为上一次发布的位置，返回值沿移动方向严格越过它
+        （定时器可能略早触发，浮点往返也可能略小于整步位置）。
+        """
+        if step <= 0:
+            return None
+        current = self.position_at(now)
+        if after is not None:
+            current = max(current, after) if self.direction > 0 else min(current, after)
+        if self.direction > 0:
+            candidate = (math.floor(current / step) + 1) * step
+            if candidate >= self.target_position:
+                return None
+        else:
+            candidate = (math.ceil(current / step) - 1) * step
+            if candidate <= self.target_position:
+                return None
+        return int(candidate)
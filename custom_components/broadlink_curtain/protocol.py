@@ -0,0 +1,237 @@
+"""博联设备异步UDP通信协议."""
+import asyncio
+import logging
+import struct
+from typing import Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 80
+DEVTYPE_RM4_PRO = 0x520B
+
+# 协议常量（与 python-broadlink 保持一致）
+_INIT_KEY = bytes.fromhex("097628343fe99e23765c1513accf8b02")
+_INIT_VECT = bytes.fromhex("562e17996d093d28ddb3ba695a2e6f58")
+_PACKET_MAGIC = bytes.fromhex("5aa5aa555aa5aa55")
+_RETRY_INTERVAL = 1.0
+
+PACKET_AUTH = 0x65
+PACKET_COMMAND = 0x6A
+
+CMD_SEND_DATA = 0x02
+CMD_CHECK_SENSORS = 0x24
+
+
+class BroadlinkProtocolError(Exception):
+    """博联设备通信错误."""
+
+
+class BroadlinkTimeoutError(BroadlinkProtocolError):
+    """博联设备响应超时."""
+
+
+def _checksum(data: bytes) -> int:
+    """计算博联协议校验和."""
+    return sum(data, 0xBEAF) & 0xFFFF
+
+
+class _BroadlinkDatagramProtocol(asyncio.DatagramProtocol):
+    """按包序号把响应分发给等待中的请求."""
+
+    def __init__(self) -> None:
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.waiters: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if len(data) < 0x38:
+            _LOGGER.debug("收到过短的数据包（%d 字节），已忽略", len(data))
+            return
+        count = int.from_bytes(data[0x28:0x2A], "little")
+        waiter = self.waiters.pop(count, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        _LOGGER.debug("UDP 通信错误: %s", exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        for waiter in self.waiters.values():
+            if not waiter.done():
+                waiter.set_exception(BroadlinkProtocolError("连接已关闭"))
+        self.waiters.clear()
+        self.transport = None
+
+
+class BroadlinkSession:
+    """与单个博联 RM4 设备之间的持久化异步会话.
+
+    会话复用一个 UDP 传输和认证得到的 AES 密钥，
+    所有请求在事件循环中等待响应，不占用执行器线程。
+    """
+
+    def __init__(
+        self,
+        host: str,
+        mac: bytes,
+        devtype: int = DEVTYPE_RM4_PRO,
+        timeout: float = 5,
+        port: int = DEFAULT_PORT,
+    ):
+        """初始化会话."""
+        self.host = host
+        self.port = port
+        self.mac = bytes(mac)
+        self.devtype = devtype
+        self.timeout = timeout
+
+        self._protocol: Optional[_BroadlinkDatagramProtocol] = None
+        self._count = 0
+        self._id = 0
+        self._key = _INIT_KEY
+        self._authenticated = False
+
+    @property
+    def connected(self) -> bool:
+        """返回会话是否已认证可用."""
+        return (
+            self._authenticated
+            and self._protocol is not None
+            and self._protocol.transport is not None
+        )
+
+    def _encrypt(self, payload: bytes) -> bytes:
+        encryptor = Cipher(algorithms.AES(self._key), modes.CBC(_INIT_VECT)).encryptor()
+        return encryptor.update(payload) + encryptor.finalize()
+
+    def _decrypt(self, payload: bytes) -> bytes:
+        decryptor = Cipher(algorithms.AES(self._key), modes.CBC(_INIT_VECT)).decryptor()
+        return decryptor.update(payload) + decryptor.finalize()
+
+    async def _async_ensure_transport(self) -> _BroadlinkDatagramProtocol:
+        """按需创建 UDP 传输."""
+        if self._protocol is None or self._protocol.transport is None:
+            loop = asyncio.get_running_loop()
+            _, protocol = await loop.create_datagram_endpoint(
+                _BroadlinkDatagramProtocol, remote_addr=(self.host, self.port)
+            )
+            self._protocol = protocol
+        return self._protocol
+
+    def _build_packet(self, packet_type: int, payload: bytes) -> Tuple[int, bytes]:
+        """构造加密数据包，返回 (包序号, 数据包)."""
+        self._count = ((self._count + 1) | 0x8000) & 0xFFFF
+        packet = bytearray(0x38)
+        packet[0x00:0x08] = _PACKET_MAGIC
+        packet[0x24:0x26] = self.devtype.to_bytes(2, "little")
+        packet[0x26:0x28] = packet_type.to_bytes(2, "little")
+        packet[0x28:0x2A] = self._count.to_bytes(2, "little")
+        packet[0x2A:0x30] = self.mac[::-1]
+        packet[0x30:0x34] = self._id.to_bytes(4, "little")
+        packet[0x34:0x36] = _checksum(payload).to_bytes(2, "little")
+
+        padding = (16 - len(payload)) % 16
+        packet.extend(self._encrypt(payload + bytes(padding)))
+        packet[0x20:0x22] = _checksum(packet).to_bytes(2, "little")
+        return self._count, bytes(packet)
+
+    async def _async_send_packet(
+        self, packet_type: int, payload: bytes, timeout: Optional[float] = None
+    ) -> bytes:
+        """发送数据包并等待响应，返回解密后的负载."""
+        protocol = await self._async_ensure_transport()
+        count, packet = self._build_packet(packet_type, payload)
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        protocol.waiters[count] = waiter
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        try:
+            # UDP 可能丢包，超时前按固定间隔重发
+            while True:
+                if protocol.transport is None:
+                    raise BroadlinkProtocolError("连接已关闭")
+                protocol.transport.sendto(packet)
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise BroadlinkTimeoutError(f"设备 {self.host} 响应超时")
+                try:
+                    response = await asyncio.wait_for(
+                        asyncio.shield(waiter), min(_RETRY_INTERVAL, remaining)
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    if loop.time() >= deadline:
+                        raise BroadlinkTimeoutError(f"设备 {self.host} 响应超时") from None
+        finally:
+            protocol.waiters.pop(count, None)
+
+        nominal = int.from_bytes(response[0x20:0x22], "little")
+        real = (sum(response, 0xBEAF) - sum(response[0x20:0x22])) & 0xFFFF
+        if nominal != real:
+            raise BroadlinkProtocolError("响应校验和错误")
+
+        err_code = int.from_bytes(response[0x22:0x24], "little", signed=True)
+        if err_code:
+            raise BroadlinkProtocolError(f"设备返回错误码: {err_code}")
+
+        return self._decrypt(response[0x38:])
+
+    async def async_auth(self) -> None:
+        """认证设备并保存会话密钥."""
+        self._authenticated = False
+        self._id = 0
+        self._key = _INIT_KEY
+
+        payload = bytearray(0x50)
+        payload[0x04:0x14] = bytes([0x31] * 16)
+        payload[0x1E] = 0x01
+        payload[0x2D] = 0x01
+        payload[0x30:0x36] = "Test 1".encode()
+
+        response = await self._async_send_packet(PACKET_AUTH, bytes(payload))
+        if len(response) < 0x14:
+            raise BroadlinkProtocolError("认证响应长度错误")
+
+        self._id = int.from_bytes(response[:0x04], "little")
+        self._key = bytes(response[0x04:0x14])
+        self._authenticated = True
+
+    async def _async_command(
+        self, command: int, data: bytes = b"", timeout: Optional[float] = None
+    ) -> bytes:
+        """发送 RM4 指令并返回响应数据."""
+        if not self._authenticated:
+            await self.async_auth()
+
+        payload = struct.pack("<HI", len(data) + 4, command) + data
+        try:
+            response = await self._async_send_packet(PACKET_COMMAND, payload, timeout)
+        except BroadlinkTimeoutError:
+            # 超时多为丢包，会话仍然有效，重试时无需重新认证
+            raise
+        except BroadlinkProtocolError:
+            # 会话可能已失效，下次请求重新认证
+            self._authenticated = False
+            raise
+        p_len = struct.unpack("<H", response[:0x02])[0]
+        return response[0x06 : p_len + 2]
+
+    async def async_send_data(self, data: bytes, timeout: Optional[float] = None) -> None:
+        """发送射频/红外数据，timeout 未指定时使用会话超时."""
+        await self._async_command(CMD_SEND_DATA, data, timeout)
+
+    async def async_check_sensors(self) -> bytes:
+        """读取传感器数据（用于在线检测）."""
+        return await self._async_command(CMD_CHECK_SENSORS)
+
+    def close(self) -> None:
+        """关闭 UDP 传输."""
+        if self._protocol is not None and self._protocol.transport is not None:
+            self._protocol.transport.close()
+        self._protocol = None
+        self._authenticated = False
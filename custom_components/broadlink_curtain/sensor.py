@@ -0,0 +1,121 @@
+"""博联窗帘诊断传感器."""
+from datetime import timedelta
+from typing import Any, Optional
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import BroadlinkCurtainCoordinator
+
+# 统计值只在内存中累计，定期读取即可
+SCAN_INTERVAL = timedelta(seconds=60)
+
+# key 对应 BroadlinkHub.stats 中的字段
+SENSOR_TYPES = (
+    SensorEntityDescription(
+        key="send_latency_p50_ms",
+        name="射频发送延迟 P50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="send_latency_p95_ms",
+        name="射频发送延迟 P95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="send_latency_p99_ms",
+        name="射频发送延迟 P99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="send_acked",
+        name="射频发送成功次数",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="send_failed",
+        name="射频发送失败次数",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="send_retries",
+        name="射频重发次数",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="reconnects",
+        name="重新连接次数",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="queue_wait_avg_ms",
+        name="发送队列平均等待",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="stop_drift_p95_ms",
+        name="停止定时误差 P95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """设置博联设备的诊断传感器."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        BroadlinkHubMetricSensor(coordinator, entry, description)
+        for description in SENSOR_TYPES
+    )
+
+
+class BroadlinkHubMetricSensor(SensorEntity):
+    """博联设备的一项发送统计."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: BroadlinkCurtainCoordinator,
+        entry: ConfigEntry,
+        description: SensorEntityDescription,
+    ):
+        """初始化传感器."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_name = f"{entry.title} {description.name}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.hub.key)},
+            name=entry.title,
+            manufacturer="Broadlink",
+            model="RM4 Pro",
+        )
+
+    @property
+    def native_value(self) -> Optional[Any]:
+        """返回当前统计值."""
+        return self.coordinator.hub.stats.get(self.entity_description.key)
@@ -1,28 +1,40 @@
 """博联窗帘服务."""
 import logging
-from typing import Any, Dict
+from typing import Any, List, Tuple
 from datetime import datetime
 
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.helpers import config_validation as cv
-from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.helpers.service import async_extract_entity_ids
 import voluptuous as vol
 
-from .const import DOMAIN
+from .calibration import async_calibrate_curtain
+from .const import DEFAULT_CALIBRATION_TIMEOUT, DOMAIN
+from .coordinator import async_get_curtain, decode_rf_code
+from .group import async_move_group
+from .motion import TravelProfile
 
 _LOGGER = logging.getLogger(__name__)
 
-SET_CURTAIN_CONFIG_SCHEMA = vol.Schema(
+SET_CURTAIN_CONFIG_SCHEMA = cv.make_entity_service_schema(
     {
         vol.Required("open_time"): cv.positive_int,
         vol.Required("close_time"): cv.positive_int,
         vol.Required("open_code"): cv.string,
         vol.Required("close_code"): cv.string,
         vol.Required("stop_code"): cv.string,
+        vol.Optional("startup_lag"): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+        vol.Optional("position_curve"): vol.All(
+            cv.ensure_list, [vol.All(vol.ExactSequence([vol.Coerce(float), vol.Coerce(float)]))]
+        ),
+        vol.Optional("end_stop_margin"): vol.All(vol.Coerce(float), vol.Range(min=0, max=50)),
+        vol.Optional("resync_after"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+        vol.Optional("reverse_delay"): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+        vol.Optional("progress_step"): vol.All(vol.Coerce(int), vol.Range(min=0, max=50)),
     }
 )
 
-TEST_RF_CODE_SCHEMA = vol.Schema(
+TEST_RF_CODE_SCHEMA = cv.make_entity_service_schema(
     {
         vol.Required("code"): cv.string,
         vol.Required("code_type"): vol.In(["open", "close", "stop"]),
@@ -36,120 +48,208 @@ SET_POSITION_SCHEMA = vol.Schema(
     }
 )
 
+CALIBRATE_SCHEMA = vol.Schema(
+    {
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("end_stop_entity"): cv.entity_id,
+        vol.Optional("timeout", default=DEFAULT_CALIBRATION_TIMEOUT): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=600)
+        ),
+    }
+)
+
+CALIBRATION_MARK_SCHEMA = vol.Schema(
+    {
+        vol.Required("entity_id"): cv.entity_id,
+    }
+)
+
+MOVE_GROUP_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required("entity_id"): cv.entity_ids,
+            vol.Exclusive("position", "target"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=100)
+            ),
+            vol.Exclusive("positions", "target"): vol.All(
+                cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=0, max=100))]
+            ),
+        }
+    ),
+    cv.has_at_least_one_key("position", "positions"),
+)
+
 
 async def async_setup_services(hass: HomeAssistant) -> None:
-    """设置服务."""
+    """设置服务（在 async_setup 中注册一次）."""
+
+    async def _async_resolve_curtains(call: ServiceCall) -> List[Tuple[Any, Any]]:
+        """解析服务目标，返回 (协调器, 实体) 列表."""
+        curtains = []
+        for entity_id in sorted(await async_extract_entity_ids(hass, call)):
+            curtain = async_get_curtain(hass, entity_id)
+            if curtain is None:
+                _LOGGER.error("找不到博联窗帘实体: %s", entity_id)
+                continue
+            curtains.append(curtain)
+        return curtains
 
     async def set_curtain_config(call: ServiceCall) -> None:
         """设置窗帘配置."""
-        entity_id = call.data["entity_id"]
         open_time = call.data["open_time"]
         close_time = call.data["close_time"]
         open_code = call.data["open_code"]
         close_code = call.data["close_code"]
         stop_code = call.data["stop_code"]
 
-        # 获取实体
-        entity = hass.states.get(entity_id)
-        if not entity:
-            _LOGGER.error("找不到实体: %s", entity_id)
-            return
+        # 可选的行程标定、限位校正、反向等待和进度发布参数
+        profile_updates = {
+            key: call.data[key]
+            for key in (
+                "startup_lag",
+                "position_curve",
+                "end_stop_margin",
+                "resync_after",
+                "reverse_delay",
+                "progress_step",
+            )
+            if key in call.data
+        }
 
-        # 获取协调器
-        coordinator = None
-        for entry_id, coord in hass.data[DOMAIN].items():
-            if hasattr(coord, 'curtains'):
-                for curtain in coord.curtains:
-                    if curtain.get("name") == entity.attributes.get("friendly_name"):
-                        coordinator = coord
-                        break
-                if coordinator:
-                    break
-
-        if not coordinator:
-            _LOGGER.error("找不到对应的协调器")
+        # 校验射频码
+        for code in (open_code, close_code, stop_code):
+            try:
+                decode_rf_code(code)
+            except ValueError as ex:
+                _LOGGER.error("射频码格式不正确: %s (%s)", code, ex)
+                return
+
+        # 校验行程标定参数
+        try:
+            TravelProfile(
+                open_time,
+                close_time,
+                profile_updates.get("startup_lag", 0.0),
+                profile_updates.get("position_curve"),
+            )
+        except ValueError as ex:
+            _LOGGER.error("行程标定参数无效: %s", ex)
             return
 
-        # 更新配置
-        for curtain in coordinator.curtains:
-            if curtain.get("name") == entity.attributes.get("friendly_name"):
-                curtain.update({
+        for coordinator, entity in await _async_resolve_curtains(call):
+            # 写回配置条目，重新解码射频码并就地更新实体
+            coordinator.async_save_curtain_config(
+                entity.curtain_name,
+                {
                     "open_time": open_time,
                     "close_time": close_time,
                     "open_code": open_code,
                     "close_code": close_code,
                     "stop_code": stop_code,
-                })
-                break
-
-        _LOGGER.info("已更新窗帘配置: %s", entity_id)
+                    **profile_updates,
+                },
+            )
+            _LOGGER.info("已更新窗帘配置: %s", entity.entity_id)
 
     async def test_rf_code(call: ServiceCall) -> None:
         """测试射频码."""
-        entity_id = call.data["entity_id"]
         code = call.data["code"]
         code_type = call.data["code_type"]
 
-        # 获取实体
-        entity = hass.states.get(entity_id)
-        if not entity:
-            _LOGGER.error("找不到实体: %s", entity_id)
-            return
-
-        # 获取协调器
-        coordinator = None
-        for entry_id, coord in hass.data[DOMAIN].items():
-            if hasattr(coord, 'curtains'):
-                for curtain in coord.curtains:
-                    if curtain.get("name") == entity.attributes.get("friendly_name"):
-                        coordinator = coord
-                        break
-                if coordinator:
-                    break
-
-        if not coordinator:
-            _LOGGER.error("找不到对应的协调器")
+        try:
+            code_bytes = decode_rf_code(code)
+        except ValueError as ex:
+            _LOGGER.error("射频码格式不正确: %s (%s)", code, ex)
             return
 
         # 发送射频码
-        success = await coordinator.async_send_rf_code(code)
-        if success:
-            _LOGGER.info("射频码发送成功: %s (%s)", code, code_type)
-        else:
-            _LOGGER.error("射频码发送失败: %s (%s)", code, code_type)
+        for coordinator, entity in await _async_resolve_curtains(call):
+            success = await coordinator.async_send_rf_code(code_bytes, entity.curtain_name)
+            if success:
+                _LOGGER.debug(
+                    "test_rf_code curtain=%s type=%s bytes=%d result=ok",
+                    entity.curtain_name,
+                    code_type,
+                    len(code_bytes),
+                )
+            else:
+                _LOGGER.error("射频码发送失败: %s（%d 字节）", code_type, len(code_bytes))
+
+    def _get_curtain_entity(entity_id: str):
+        """获取窗帘实体对象."""
+        curtain = async_get_curtain(hass, entity_id)
+        if curtain is None:
+            _LOGGER.error("找不到博联窗帘实体: %s", entity_id)
+            return None
+        return curtain[1]
 
     async def set_position_manually(call: ServiceCall) -> None:
         """手动设置窗帘位置（用于手动操作后同步状态）."""
         entity_id = call.data["entity_id"]
         position = call.data["position"]
 
-        _LOGGER.info("🔧 手动设置窗帘位置: %s -> %d%%", entity_id, position)
+        entity = _get_curtain_entity(entity_id)
+        if entity is None:
+            return
+
+        # 更新位置
+        old_position = entity.current_cover_position
+        entity._last_manual_update = datetime.now().isoformat()
+        entity.set_known_position(position)
+        _LOGGER.info("🔧 手动设置窗帘 %s 位置: %d%% -> %d%%", entity_id, old_position, position)
 
-        # 获取实体对象
-        component = hass.data.get(COVER_DOMAIN)
-        if not component:
-            _LOGGER.error("找不到cover组件")
+    async def calibrate(call: ServiceCall) -> None:
+        """自动标定窗帘行程时间."""
+        entity = _get_curtain_entity(call.data["entity_id"])
+        if entity is None:
             return
 
-        entity = component.get_entity(entity_id)
-        if not entity:
-            _LOGGER.error("找不到实体: %s", entity_id)
+        if entity.calibration is not None:
+            _LOGGER.warning("窗帘 %s 已在标定中", call.data["entity_id"])
             return
 
-        # 更新位置
-        if hasattr(entity, '_position'):
-            old_position = entity._position
-            entity._position = position
-            entity._last_manual_update = datetime.now().isoformat()
+        # 标定需要等待用户标记终点，在后台运行，卸载配置条目时取消
+        entity.coordinator.async_track_task(
+            hass.async_create_task(
+                async_calibrate_curtain(
+                    hass, entity, call.data.get("end_stop_entity"), call.data["timeout"]
+                )
+            )
+        )
 
-            # 更新支持的功能
-            if hasattr(entity, '_update_supported_features'):
-                entity._update_supported_features()
+    async def calibration_mark(call: ServiceCall) -> None:
+        """标记标定行程已到达终点."""
+        entity = _get_curtain_entity(call.data["entity_id"])
+        if entity is None:
+            return
 
-            entity.async_write_ha_state()
-            _LOGGER.info("✅ 已更新窗帘 %s 位置: %d%% -> %d%%", entity_id, old_position, position)
-        else:
-            _LOGGER.error("实体 %s 不支持位置设置", entity_id)
+        if entity.calibration is None:
+            _LOGGER.warning("窗帘 %s 没有正在进行的标定", call.data["entity_id"])
+            return
+
+        entity.calibration.mark()
+
+    async def move_group(call: ServiceCall) -> None:
+        """批量移动多个窗帘."""
+        entity_ids = call.data["entity_id"]
+        positions = call.data.get("positions")
+        if positions is None:
+            positions = [call.data["position"]] * len(entity_ids)
+        elif len(positions) != len(entity_ids):
+            _LOGGER.error("positions 数量 (%d) 与实体数量 (%d) 不一致", len(positions), len(entity_ids))
+            return
+
+        moves = []
+        for entity_id, position in zip(entity_ids, positions):
+            entity = _get_curtain_entity(entity_id)
+            if entity is not None:
+                moves.append((entity, position))
+
+        if moves:
+            # 任一相关配置条目卸载时取消整组移动
+            task = hass.async_create_task(async_move_group(hass, moves))
+            for coordinator in {entity.coordinator for entity, _ in moves}:
+                coordinator.async_track_task(task)
 
     # 注册服务
     hass.services.async_register(
@@ -161,3 +261,12 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     hass.services.async_register(
         DOMAIN, "set_position_manually", set_position_manually, schema=SET_POSITION_SCHEMA
     )
+    hass.services.async_register(
+        DOMAIN, "calibrate", calibrate, schema=CALIBRATE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, "calibration_mark", calibration_mark, schema=CALIBRATION_MARK_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, "move_group", move_group, schema=MOVE_GROUP_SCHEMA
+    )
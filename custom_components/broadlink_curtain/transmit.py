@@ -0,0 +1,248 @@
+"""博联窗帘射频发送队列."""
+import asyncio
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .const import RF_CODE_CLOSE, RF_CODE_OPEN, RF_CODE_STOP, RF_DEDUP_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+# 发送优先级（数值越小越先发送）
+PRIORITY_STOP = 0
+PRIORITY_MOVE = 1
+PRIORITY_OTHER = 2
+
+_COMMAND_PRIORITY = {
+    RF_CODE_STOP: PRIORITY_STOP,
+    RF_CODE_OPEN: PRIORITY_MOVE,
+    RF_CODE_CLOSE: PRIORITY_MOVE,
+}
+
+
+class _TxRequest:
+    """队列中的一次发送请求."""
+
+    __slots__ = (
+        "send_id",
+        "code",
+        "curtain",
+        "command",
+        "priority",
+        "enqueued",
+        "future",
+        "superseded",
+    )
+
+    def __init__(
+        self,
+        send_id: int,
+        code: Any,
+        curtain: Optional[str],
+        command: Optional[str],
+        enqueued: float,
+        future: asyncio.Future,
+    ):
+        self.send_id = send_id
+        self.code = code
+        self.curtain = curtain
+        self.command = command
+        self.priority = _COMMAND_PRIORITY.get(command, PRIORITY_OTHER)
+        self.enqueued = enqueued
+        self.future = future
+        self.superseded = False
+
+
+class RFTransmitQueue:
+    """单个博联设备的射频发送队列.
+
+    所有发送请求在同一个协程中串行执行，停止指令优先于开/关指令，
+    同一窗帘尚未发出的开/关指令会被后来的开/关/停指令取代，
+    未指定指令的临时发送（如测试射频码）不参与合并与取代。
+    每个请求分配一个发送编号，同一窗帘在确认后短时间内重复的开/关指令
+    直接返回已确认的结果而不再发送，停止指令总是发送。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[Any, int, Optional[str], Optional[str]], Awaitable[bool]],
+    ):
+        """初始化发送队列."""
+        self._name = name
+        self._send = send
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._pending: Dict[str, _TxRequest] = {}
+        self._seq = itertools.count()
+        self._send_ids = itertools.count(1)
+        # 最近确认的开/关指令: 窗帘 -> (指令, 射频码, 确认时间, 发送编号)
+        self._acked: Dict[str, Tuple[Optional[str], Any, float, int]] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._current: Optional[_TxRequest] = None  # 正在发送的请求
+        self._depth = 0
+
+        # 统计信息
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+        self.sent_count = 0
+        self.superseded_count = 0
+        self.deduplicated_count = 0
+
+    @property
+    def depth(self) -> int:
+        """返回当前等待发送的请求数."""
+        return self._depth
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """返回队列统计信息."""
+        avg_wait = self.total_wait / self.sent_count if self.sent_count else 0.0
+        return {
+            "queue_depth": self._depth,
+            "queue_wait_last_ms": round(self.last_wait * 1000, 1),
+            "queue_wait_avg_ms": round(avg_wait * 1000, 1),
+            "queue_wait_max_ms": round(self.max_wait * 1000, 1),
+            "queue_sent": self.sent_count,
+            "queue_superseded": self.superseded_count,
+            "queue_deduplicated": self.deduplicated_count,
+        }
+
+    async def async_send(
+        self,
+        code: Any,
+        curtain: Optional[str] = None,
+        command: Optional[str] = None,
+    ) -> bool:
+        """加入队列并等待发送结果."""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker()
+
+        tracked = curtain is not None and command in _COMMAND_PRIORITY
+        if tracked:
+            pending = self._pending.get(curtain)
+            if (pending is None or pending.future.done()) and self._is_duplicate(
+                curtain, command, code, loop.time()
+            ):
+                self.deduplicated_count += 1
+                _LOGGER.debug(
+                    "窗帘 %s 的 %s 指令已由发送 #%d 确认，不再重复发送",
+                    curtain,
+                    command,
+                    self._acked[curtain][3],
+                )
+                return True
+
+            if pending is not None and not pending.future.done():
+                if pending.command == command and pending.code == code:
+                    # 相同指令尚未发出，直接合并
+                    return await asyncio.shield(pending.future)
+                if pending.priority == PRIORITY_MOVE:
+                    # 开/关指令被新指令取代
+                    pending.superseded = True
+                    pending.future.set_result(False)
+                    self._depth -= 1
+                    self.superseded_count += 1
+                    _LOGGER.debug(
+                        "窗帘 %s 的 %s 指令被 %s 指令取代", curtain, pending.command, command
+                    )
+
+        request = _TxRequest(
+            next(self._send_ids), code, curtain, command, loop.time(), loop.create_future()
+        )
+        if tracked:
+            self._pending[curtain] = request
+        self._depth += 1
+        self._queue.put_nowait((request.priority, next(self._seq), request))
+
+        return await asyncio.shield(request.future)
+
+    def _is_duplicate(
+        self, curtain: str, command: Optional[str], code: Any, now: float
+    ) -> bool:
+        """判断是否为刚确认过的相同开/关指令."""
+        if command not in (RF_CODE_OPEN, RF_CODE_CLOSE):
+            return False
+        acked = self._acked.get(curtain)
+        return (
+            acked is not None
+            and acked[0] == command
+            and acked[1] == code
+            and now - acked[2] < RF_DEDUP_WINDOW
+        )
+
+    def _ensure_worker(self) -> None:
+        """确保发送协程正在运行."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._async_worker())
+
+    async def _async_worker(self) -> None:
+        """串行发送队列中的请求."""
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, request = await self._queue.get()
+            if request.superseded:
+                continue
+
+            self._depth -= 1
+            if request.curtain is not None and self._pending.get(request.curtain) is request:
+                del self._pending[request.curtain]
+
+            wait = loop.time() - request.enqueued
+            self.last_wait = wait
+            self.max_wait = max(self.max_wait, wait)
+            self.total_wait += wait
+            self.sent_count += 1
+
+            self._current = request
+            try:
+                result = await self._send(
+                    request.code, request.send_id, request.curtain, request.command
+                )
+            except asyncio.CancelledError:
+                # 队列关闭时正在发送的请求按失败返回，等待方不会一直挂起
+                if not request.future.done():
+                    request.future.set_result(False)
+                raise
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.error("射频发送队列 %s 发送异常: %s", self._name, ex)
+                result = False
+            finally:
+                self._current = None
+
+            if request.curtain is not None:
+                if result and request.command in (RF_CODE_OPEN, RF_CODE_CLOSE):
+                    self._acked[request.curtain] = (
+                        request.command,
+                        request.code,
+                        loop.time(),
+                        request.send_id,
+                    )
+                else:
+                    # 停止指令或发送失败后，下一条开/关指令必须重新发送
+                    self._acked.pop(request.curtain, None)
+
+            if not request.future.done():
+                request.future.set_result(result)
+
+    async def async_close(self) -> None:
+        """停止发送协程并放弃尚未发送的请求."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+        current, self._current = self._current, None
+        if current is not None and not current.future.done():
+            current.future.set_result(False)
+
+        while not self._queue.empty():
+            _, _, request = self._queue.get_nowait()
+            if not request.future.done():
+                request.future.set_result(False)
+        self._pending.clear()
+        self._acked.clear()
+        self._depth = 0
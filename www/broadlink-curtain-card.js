@@ -1,48 +1,52 @@
+// mdi:curtains (打开) 和 mdi:curtains-closed (关闭)
+const ICON_OPEN = 'M3 3v2h18V3M3 19v2h18v19M13 6v11h8V6M4 6v11h8V6m-1 1v9H5V7m8 0v9h6V7Z';
+const ICON_CLOSED = 'M15.5 6.5A1.5 1.5 0 0 1 17 8v8a1.5 1.5 0 0 1-1.5 1.5h-7A1.5 1.5 0 0 1 7 16V8a1.5 1.5 0 0 1 1.5-1.5M3 3v2h18V3M3 19v2h18v-2Z';
+
 class BroadlinkCurtainCard extends HTMLElement {
   constructor() {
     super();
     this._hass = null;
     this._expanded = false; // 添加展开状态
+    this._stateObj = undefined; // 上一次渲染的实体状态对象
+    this._rendered = {}; // 上一次写入 DOM 的值，只更新变化的节点
+    this._dragging = false; // 正在拖动滑块时不覆盖滑块的值
+    this._motion = null; // 后端发布的运动参数，移动中本地插值位置
+    this._clockOffset = null; // 本地时钟与服务器时钟之差（秒）
+    this._frame = null;
+  }
+
+  disconnectedCallback() {
+    this.stopAnimation();
+  }
+
+  connectedCallback() {
+    if (this._motion) {
+      this.startAnimation();
+    }
   }
 
   set hass(hass) {
     this._hass = hass;
 
     if (!this.content) {
-      const card = document.createElement('ha-card');
-      this.content = document.createElement('div');
-      card.appendChild(this.content);
-      this.appendChild(card);
+      this.build();
     }
 
-    const entityId = this.config.entity;
-    const state = hass.states[entityId];
-
-    if (!state) {
-      this.content.innerHTML = `
-        <div style="color: red; padding: 16px;">找不到实体: ${entityId}</div>
-      `;
+    // hass 对象在任何实体变化时都会更新，实体状态对象不变时无需渲染
+    const state = hass.states[this.config.entity];
+    if (state === this._stateObj) {
       return;
     }
-
-    const currentPosition = state.attributes.current_position || 0;
-    const currentState = state.attributes.current_state || 'stopped';
-
-    // 根据展开状态渲染不同的视图
-    if (this._expanded) {
-      this.renderExpanded(currentPosition, currentState, entityId);
-    } else {
-      this.renderCompact(currentPosition, currentState, entityId);
-    }
+    this._stateObj = state;
+    this.update();
   }
 
-  renderCompact(currentPosition, currentState, entityId) {
-    // 根据位置判断窗帘状态，选择图标
-    const isOpen = currentPosition > 50;
-    // mdi:curtains (打开) 和 mdi:curtains-closed (关闭)
-    const iconPath = isOpen
-      ? 'M3 3v2h18V3M3 19v2h18v19M13 6v11h8V6M4 6v11h8V6m-1 1v9H5V7m8 0v9h6V7Z' // mdi:curtains
-      : 'M15.5 6.5A1.5 1.5 0 0 1 17 8v8a1.5 1.5 0 0 1-1.5 1.5h-7A1.5 1.5 0 0 1 7 16V8a1.5 1.5 0 0 1 1.5-1.5M3 3v2h18V3M3 19v2h18v-2Z'; // mdi:curtains-closed
+  // 只在首次设置 hass 时创建 DOM 和事件监听
+  build() {
+    const card = document.createElement('ha-card');
+    this.content = document.createElement('div');
+    card.appendChild(this.content);
+    this.appendChild(card);
 
     this.content.innerHTML = `
       <style>
@@ -128,48 +132,6 @@ class BroadlinkCurtainCard extends HTMLElement {
           box-shadow: 0 2px 4px rgba(0,0,0,0.2);
           transition: left 0.3s;
         }
-      </style>
-      <div class="compact-view">
-        <div class="compact-icon-wrapper" id="icon-button">
-          <svg class="compact-icon" viewBox="0 0 24 24">
-            <path d="${iconPath}"/>
-          </svg>
-        </div>
-        <div class="compact-info">
-          <div class="compact-name">窗帘</div>
-          <div class="compact-right">
-            <div class="compact-slider-container" id="compact-slider">
-              <div class="compact-slider-fill" style="width: ${currentPosition}%"></div>
-              <div class="compact-slider-thumb" style="left: ${currentPosition}%"></div>
-            </div>
-            <div class="compact-position">${currentPosition}%</div>
-          </div>
-        </div>
-      </div>
-    `;
-
-    // 点击图标展开详细视图
-    const iconButton = this.content.querySelector('#icon-button');
-    iconButton.addEventListener('click', (e) => {
-      e.stopPropagation();
-      this._expanded = true;
-      this.hass = this._hass;
-    });
-
-    // 点击进度条设置位置
-    const sliderContainer = this.content.querySelector('#compact-slider');
-    sliderContainer.addEventListener('click', (e) => {
-      const rect = sliderContainer.getBoundingClientRect();
-      const x = e.clientX - rect.left;
-      const percentage = Math.round((x / rect.width) * 100);
-      const position = Math.max(0, Math.min(100, percentage));
-      this.setPosition(this._hass, entityId, position);
-    });
-  }
-
-  renderExpanded(currentPosition, currentState, entityId) {
-    this.content.innerHTML = `
-      <style>
         .curtain-control {
           display: flex;
           flex-direction: column;
@@ -326,8 +288,33 @@ class BroadlinkCurtainCard extends HTMLElement {
           font-size: 11px;
           color: var(--secondary-text-color);
         }
+        .hidden {
+          display: none;
+        }
+        .error {
+          color: red;
+          padding: 16px;
+        }
       </style>
-      <div class="curtain-control">
+      <div class="error hidden" id="error"></div>
+      <div class="compact-view" id="compact-view">
+        <div class="compact-icon-wrapper" id="icon-button">
+          <svg class="compact-icon" viewBox="0 0 24 24">
+            <path id="compact-icon-path" d="${ICON_CLOSED}"/>
+          </svg>
+        </div>
+        <div class="compact-info">
+          <div class="compact-name">窗帘</div>
+          <div class="compact-right">
+            <div class="compact-slider-container" id="compact-slider">
+              <div class="compact-slider-fill" id="compact-fill" style="width: 0%"></div>
+              <div class="compact-slider-thumb" id="compact-thumb" style="left: 0%"></div>
+            </div>
+            <div class="compact-position" id="compact-position">0%</div>
+          </div>
+        </div>
+      </div>
+      <div class="curtain-control hidden" id="expanded-view">
         <div class="header-bar">
           <button class="back-button" id="back-button">
             <svg width="20" height="20" viewBox="0 0 24 24" fill="currentColor">
@@ -337,14 +324,10 @@ class BroadlinkCurtainCard extends HTMLElement {
           <div class="header-title">窗帘控制</div>
           <div style="width: 28px;"></div>
         </div>
-        <div class="position-display">
-          ${currentPosition}%
-        </div>
-        <div class="state-info">
-          ${this.getStateText(currentState)}
-        </div>
+        <div class="position-display" id="position-display">0%</div>
+        <div class="state-info" id="state-info"></div>
         <div class="slider-container">
-          <input type="range" min="0" max="100" value="${currentPosition}"
+          <input type="range" min="0" max="100" value="0"
                  class="slider" id="position-slider">
           <div class="slider-label">
             <span>关闭</span>
@@ -354,7 +337,7 @@ class BroadlinkCurtainCard extends HTMLElement {
         <div class="control-buttons">
           <button class="control-button" id="open-button">
             <svg width="18" height="18" viewBox="0 0 24 24" fill="currentColor">
-              <path d="M3 3v2h18V3M3 19v2h18v19M13 6v11h8V6M4 6v11h8V6m-1 1v9H5V7m8 0v9h6V7Z"/>
+              <path d="${ICON_OPEN}"/>
             </svg>
             全开
           </button>
@@ -366,81 +349,223 @@ class BroadlinkCurtainCard extends HTMLElement {
           </button>
           <button class="control-button" id="close-button">
             <svg width="18" height="18" viewBox="0 0 24 24" fill="currentColor">
-              <path d="M15.5 6.5A1.5 1.5 0 0 1 17 8v8a1.5 1.5 0 0 1-1.5 1.5h-7A1.5 1.5 0 0 1 7 16V8a1.5 1.5 0 0 1 1.5-1.5M3 3v2h18V3M3 19v2h18v-2Z"/>
+              <path d="${ICON_CLOSED}"/>
             </svg>
             全关
           </button>
         </div>
         <div class="position-buttons">
-          <button class="position-button ${currentPosition === 25 ? 'current' : ''}"
-                  data-position="25">25%</button>
-          <button class="position-button ${currentPosition === 50 ? 'current' : ''}"
-                  data-position="50">50%</button>
-          <button class="position-button ${currentPosition === 75 ? 'current' : ''}"
-                  data-position="75">75%</button>
+          <button class="position-button" data-position="25">25%</button>
+          <button class="position-button" data-position="50">50%</button>
+          <button class="position-button" data-position="75">75%</button>
         </div>
       </div>
     `;
 
+    const $ = (id) => this.content.querySelector(`#${id}`);
+    this._nodes = {
+      error: $('error'),
+      compactView: $('compact-view'),
+      expandedView: $('expanded-view'),
+      iconPath: $('compact-icon-path'),
+      compactFill: $('compact-fill'),
+      compactThumb: $('compact-thumb'),
+      compactPosition: $('compact-position'),
+      positionDisplay: $('position-display'),
+      stateInfo: $('state-info'),
+      slider: $('position-slider'),
+      positionButtons: Array.from(this.content.querySelectorAll('.position-button')),
+    };
+
+    // 点击图标展开详细视图
+    $('icon-button').addEventListener('click', (e) => {
+      e.stopPropagation();
+      this.setExpanded(true);
+    });
+
+    // 点击进度条设置位置
+    const sliderContainer = $('compact-slider');
+    sliderContainer.addEventListener('click', (e) => {
+      const rect = sliderContainer.getBoundingClientRect();
+      const x = e.clientX - rect.left;
+      const percentage = Math.round((x / rect.width) * 100);
+      const position = Math.max(0, Math.min(100, percentage));
+      this.setPosition(this._hass, this.config.entity, position);
+    });
+
     // 添加返回按钮事件
-    const backButton = this.content.querySelector('#back-button');
-    backButton.addEventListener('click', (e) => {
+    $('back-button').addEventListener('click', (e) => {
       e.stopPropagation();
-      this._expanded = false;
-      this.hass = this._hass; // 重新渲染
+      this.setExpanded(false);
     });
 
-    // 添加全开按钮事件
-    const openButton = this.content.querySelector('#open-button');
-    openButton.addEventListener('click', () => {
+    // 添加全开/全关/暂停按钮事件
+    $('open-button').addEventListener('click', () => {
       this._hass.callService('cover', 'open_cover', {
-        entity_id: entityId
+        entity_id: this.config.entity
       });
     });
-
-    // 添加全关按钮事件
-    const closeButton = this.content.querySelector('#close-button');
-    closeButton.addEventListener('click', () => {
+    $('close-button').addEventListener('click', () => {
       this._hass.callService('cover', 'close_cover', {
-        entity_id: entityId
+        entity_id: this.config.entity
       });
     });
-
-    // 添加暂停按钮事件
-    const stopButton = this.content.querySelector('#stop-button');
-    stopButton.addEventListener('click', () => {
+    $('stop-button').addEventListener('click', () => {
       this._hass.callService('cover', 'stop_cover', {
-        entity_id: entityId
+        entity_id: this.config.entity
       });
     });
 
     // 添加位置按钮事件监听
-    this.content.querySelectorAll('.position-button').forEach(button => {
+    this._nodes.positionButtons.forEach(button => {
       button.addEventListener('click', () => {
         const position = parseInt(button.dataset.position);
-        this.setPosition(this._hass, entityId, position);
+        this.setPosition(this._hass, this.config.entity, position);
       });
     });
 
-    // 添加滑块事件监听
-    const slider = this.content.querySelector('#position-slider');
-
     // 实时更新滑块显示（拖动时）
+    const slider = this._nodes.slider;
     slider.addEventListener('input', () => {
-      const position = parseInt(slider.value);
-      const display = this.content.querySelector('.position-display');
-      if (display) {
-        display.textContent = `${position}%`;
-      }
+      this._dragging = true;
+      this.patchText(this._nodes.positionDisplay, 'display', `${parseInt(slider.value)}%`);
     });
 
     // 松开滑块时设置位置
     slider.addEventListener('change', () => {
+      this._dragging = false;
       const position = parseInt(slider.value);
-      this.setPosition(this._hass, entityId, position);
+      this.setPosition(this._hass, this.config.entity, position);
     });
   }
 
+  // 按实体状态更新变化的节点
+  update() {
+    const nodes = this._nodes;
+    const state = this._stateObj;
+
+    if (!state) {
+      this.patchText(nodes.error, 'error', `找不到实体: ${this.config.entity}`);
+      nodes.error.classList.remove('hidden');
+      nodes.compactView.classList.add('hidden');
+      nodes.expandedView.classList.add('hidden');
+      return;
+    }
+    nodes.error.classList.add('hidden');
+    this.applyExpanded();
+
+    const attributes = state.attributes;
+    const currentPosition = attributes.current_position || 0;
+    const currentState = state.state;
+
+    // 估计时钟差: 状态写入后很快到达，取观测到的最小值
+    const offset = Date.now() / 1000 - Date.parse(state.last_updated) / 1000;
+    if (!Number.isNaN(offset)) {
+      this._clockOffset = this._clockOffset === null ? offset : Math.min(this._clockOffset, offset);
+    }
+
+    // 移动中按运动参数本地插值，停止后以后端位置为准
+    if (attributes.motion_start !== undefined
+        && (currentState === 'opening' || currentState === 'closing')) {
+      this._motion = {
+        start: attributes.motion_start,
+        startPosition: attributes.motion_start_position,
+        target: attributes.motion_target,
+        velocity: attributes.motion_velocity,
+      };
+      this.startAnimation();
+    } else {
+      this._motion = null;
+      this.stopAnimation();
+      this.renderPosition(currentPosition);
+    }
+
+    const stateText = this.getStateText(currentState);
+    this.patchText(nodes.stateInfo, 'stateText', stateText);
+  }
+
+  renderPosition(currentPosition) {
+    const nodes = this._nodes;
+    const rendered = this._rendered;
+    if (rendered.position === currentPosition) {
+      return;
+    }
+    rendered.position = currentPosition;
+
+    // 根据位置判断窗帘状态，选择图标
+    const iconPath = currentPosition > 50 ? ICON_OPEN : ICON_CLOSED;
+    if (rendered.iconPath !== iconPath) {
+      rendered.iconPath = iconPath;
+      nodes.iconPath.setAttribute('d', iconPath);
+    }
+
+    nodes.compactFill.style.width = `${currentPosition}%`;
+    nodes.compactThumb.style.left = `${currentPosition}%`;
+    nodes.compactPosition.textContent = `${currentPosition}%`;
+
+    if (!this._dragging) {
+      nodes.slider.value = currentPosition;
+      this.patchText(nodes.positionDisplay, 'display', `${currentPosition}%`);
+    }
+
+    nodes.positionButtons.forEach(button => {
+      button.classList.toggle('current', parseInt(button.dataset.position) === currentPosition);
+    });
+  }
+
+  // 按运动参数计算当前位置（服务器时间）
+  motionPosition(motion) {
+    const now = Date.now() / 1000 - (this._clockOffset || 0);
+    const position = motion.startPosition + motion.velocity * Math.max(0, now - motion.start);
+    const low = Math.min(motion.startPosition, motion.target);
+    const high = Math.max(motion.startPosition, motion.target);
+    return Math.round(Math.max(low, Math.min(high, position)));
+  }
+
+  startAnimation() {
+    if (this._frame !== null || !this.isConnected) {
+      return;
+    }
+    const step = () => {
+      this._frame = null;
+      const motion = this._motion;
+      if (!motion) {
+        return;
+      }
+      const position = this.motionPosition(motion);
+      this.renderPosition(position);
+      // 到达目标后停止动画，等待后端的最终状态
+      if (position !== Math.round(motion.target)) {
+        this._frame = requestAnimationFrame(step);
+      }
+    };
+    this._frame = requestAnimationFrame(step);
+  }
+
+  stopAnimation() {
+    if (this._frame !== null) {
+      cancelAnimationFrame(this._frame);
+      this._frame = null;
+    }
+  }
+
+  patchText(node, key, text) {
+    if (this._rendered[key] !== text) {
+      this._rendered[key] = text;
+      node.textContent = text;
+    }
+  }
+
+  setExpanded(expanded) {
+    this._expanded = expanded;
+    this.applyExpanded();
+  }
+
+  applyExpanded() {
+    this._nodes.compactView.classList.toggle('hidden', this._expanded);
+    this._nodes.expandedView.classList.toggle('hidden', !this._expanded);
+  }
+
   getStateText(state) {
     const stateMap = {
       'opening': '正在打开',
@@ -464,6 +589,12 @@ class BroadlinkCurtainCard extends HTMLElement {
       throw new Error('请指定entity');
     }
     this.config = config;
+    // 更换实体后下一次 hass 更新需要重新渲染
+    this._stateObj = undefined;
+    this._rendered = {};
+    if (this._hass && this.content) {
+      this.hass = this._hass;
+    }
   }
 
   getCardSize() {
@@ -479,4 +610,3 @@ window.customCards.push({
   name: '博联窗帘控制卡片',
   description: '带快捷位置按钮的窗帘控制卡片'
 });
-